@@ -6,6 +6,30 @@ import os
 import traceback
 from backend.utils import log_info, log_warning, log_error
 
+# Numba est optionnel: sans lui, le filtrage par zone reste vectorisé avec numpy
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _bbox_mask_numpy(lat, lon, lat_min, lat_max, lon_min, lon_max):
+    return (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _bbox_mask(lat, lon, lat_min, lat_max, lon_min, lon_max):
+        """Masque booléen des points dans la zone, en une seule passe compilée"""
+        n = lat.shape[0]
+        mask = np.empty(n, dtype=np.bool_)
+        for i in range(n):
+            mask[i] = lat_min <= lat[i] <= lat_max and lon_min <= lon[i] <= lon_max
+        return mask
+else:
+    _bbox_mask = _bbox_mask_numpy
+
+
 class OptimizedGraphGTFS:
     """
     Version optimisée de GrapheGTFS qui permet le chargement rapide et filtré des stations.
@@ -30,6 +54,10 @@ class OptimizedGraphGTFS:
             
         # On ne charge les autres dataframes que lorsque nécessaire
         self._graph = None
+        # Coordonnées en tableaux contigus pour le filtrage par zone (construits à la demande)
+        self._stop_lat = None
+        self._stop_lon = None
+        self._transfers = None
     
     def load_graph_for_zone(self, lat_min, lat_max, lon_min, lon_max):
         """
@@ -63,12 +91,12 @@ class OptimizedGraphGTFS:
             log_info(f"Filtrage des arrets entre [{lat_min},{lat_max}] lat et [{lon_min},{lon_max}] lon")
             
             # Filtrer les stops par zone géographique (filtrage précoce)
-            zone_stops = self.stops[
-                (self.stops['stop_lat'] >= lat_min) & 
-                (self.stops['stop_lat'] <= lat_max) & 
-                (self.stops['stop_lon'] >= lon_min) & 
-                (self.stops['stop_lon'] <= lon_max)
-            ]
+            if self._stop_lat is None:
+                self._stop_lat = np.ascontiguousarray(self.stops['stop_lat'].to_numpy(dtype=np.float64))
+                self._stop_lon = np.ascontiguousarray(self.stops['stop_lon'].to_numpy(dtype=np.float64))
+            mask = _bbox_mask(self._stop_lat, self._stop_lon,
+                              float(lat_min), float(lat_max), float(lon_min), float(lon_max))
+            zone_stops = self.stops[mask]
             
             log_info(f"Trouve {len(zone_stops)} arrets dans la zone")
             
@@ -77,13 +105,16 @@ class OptimizedGraphGTFS:
                 log_warning("Aucune station trouvee dans la zone demandee")
                 return graph
                 
-            # Charger uniquement les données nécessaires
-            try:
-                transfers = pd.read_pickle(f"{self.data_path}/transfers.pkl")
-                log_info(f"Charge {len(transfers)} transferts")
-            except Exception as e:
-                log_error(f"Erreur lors du chargement des transferts: {str(e)}")
-                transfers = pd.DataFrame()
+            # Charger uniquement les données nécessaires (une seule fois par instance)
+            transfers = self._transfers
+            if transfers is None:
+                try:
+                    transfers = pd.read_pickle(f"{self.data_path}/transfers.pkl")
+                    log_info(f"Charge {len(transfers)} transferts")
+                    self._transfers = transfers
+                except Exception as e:
+                    log_error(f"Erreur lors du chargement des transferts: {str(e)}")
+                    transfers = pd.DataFrame()
                 
             return self._build_graph_from_stops(zone_stops, transfers)
                 
@@ -486,13 +517,17 @@ class OptimizedGraphGTFS:
         import logging
         logger = logging.getLogger(__name__)
         
-        # Construire un graphe non orienté optimisé
-        G = self.build_connectivity_graph()
-        
-        # Pour un graphe non orienté, on utilise is_connected
-        is_connected = nx.is_connected(G)
+        # Les données sont figées après chargement: un seul parcours suffit
+        is_connected = getattr(self, "_connected_cached", None)
+        if is_connected is None:
+            # Construire un graphe non orienté optimisé
+            G = self.build_connectivity_graph()
+            
+            # Pour un graphe non orienté, on utilise is_connected
+            is_connected = nx.is_connected(G)
+            self._connected_cached = is_connected
         
-        logger.info(f"[STATISTIQUES] Réseau connexe: {'OUI' if is_connected else 'NON'}")
+        logger.info("[STATISTIQUES] Réseau connexe: %s", 'OUI' if is_connected else 'NON')
         return is_connected
     
     def get_connectivity_details(self) -> dict:
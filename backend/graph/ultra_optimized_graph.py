@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import os
 from typing import Dict, List, Tuple, Optional, Set
 import pickle
+import json
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import sqlite3
@@ -31,6 +32,10 @@ class UltraOptimizedGraphGTFS:
     def __init__(self, data_path: str):
         self.data_path = data_path
         self.db_path = f"{data_path}/metro_graph.db"
+        self.meta_path = f"{data_path}/meta.json"
+        self._connected_cached: Optional[bool] = None
+        # Incrémenté à chaque (re)construction de la DB, sert de clé aux caches de l'API
+        self.version = 0
         self.stops = None
         self.routes = None
         self.transfers = None
@@ -81,6 +86,7 @@ class UltraOptimizedGraphGTFS:
     def _create_database(self):
         """Crée la base de données SQLite optimisée"""
         logger.info("Création de la base de données SQLite...")
+        self.version += 1
         
         # Supprimer l'ancienne DB si elle existe
         if os.path.exists(self.db_path):
@@ -396,6 +402,11 @@ class UltraOptimizedGraphGTFS:
     
     def clear_database(self):
         """Supprime la base de données pour forcer une reconstruction"""
+        self._connected_cached = None
+        self._full_graph = None
+        self.version += 1
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
         if os.path.exists(self.db_path):
             os.remove(self.db_path)
             logger.info("Base de données supprimée - prochaine utilisation recréera la DB")
@@ -504,23 +515,60 @@ class UltraOptimizedGraphGTFS:
         finally:
             conn.close()
     
+    def _source_mtime(self) -> float:
+        """Date de modification la plus récente parmi la DB et les pickles sources"""
+        files = [self.db_path] + [
+            f"{self.data_path}/{name}.pkl"
+            for name in ("stops", "stop_times", "trips", "routes", "transfers")
+        ]
+        return max((os.path.getmtime(f) for f in files if os.path.exists(f)), default=0.0)
+
+    def _load_meta(self) -> Dict:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Le résultat n'est valable que si les données n'ont pas bougé depuis
+        if meta.get("source_mtime") != self._source_mtime():
+            return {}
+        return meta
+
+    def _save_meta(self, **values):
+        meta = self._load_meta()
+        meta.update(values, source_mtime=self._source_mtime())
+        try:
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logger.warning("Impossible d'écrire %s: %s", self.meta_path, e)
+
+    def _compute_connected(self) -> bool:
+        """Parcours complet du réseau pour tester la connexité faible"""
+        if not hasattr(self, '_full_graph') or self._full_graph is None:
+            self._full_graph = self.build_full_network_graph()
+
+        # Pour un réseau de transport, on vérifie la connexité faible
+        # (ignore la direction des arêtes)
+        return nx.is_weakly_connected(self._full_graph)
+
     def connected(self):
         """
         Vérifie si le réseau de transport est connexe (toutes les stations sont accessibles).
         Pour un graphe orienté, on vérifie la connexité faible.
+        Le résultat est mémorisé sur l'instance et dans meta.json à côté de la DB,
+        il n'est recalculé que si les données sources changent.
         """
-        logger.info("🔍 Vérification de la connexité du réseau...")
-        
-        # Construire un graphe avec toutes les stations et connexions
-        if not hasattr(self, '_full_graph') or self._full_graph is None:
-            self._full_graph = self.build_full_network_graph()
-        
-        # Pour un réseau de transport, on vérifie la connexité faible
-        # (ignore la direction des arêtes)
-        is_connected = nx.is_weakly_connected(self._full_graph)
-        
-        logger.info(f"[STATISTIQUES] Réseau connexe: {'OUI' if is_connected else 'NON'}")
-        return is_connected
+        if self._connected_cached is None:
+            cached = self._load_meta().get("connected")
+            if cached is None:
+                logger.info("🔍 Vérification de la connexité du réseau...")
+                cached = self._compute_connected()
+                self._save_meta(connected=cached)
+            self._connected_cached = bool(cached)
+
+        logger.info("[STATISTIQUES] Réseau connexe: %s", 'OUI' if self._connected_cached else 'NON')
+        return self._connected_cached
     
     def get_connectivity_details(self) -> Dict:
         """
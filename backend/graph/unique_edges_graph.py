@@ -4,19 +4,45 @@ Cette version ne crée qu'UNE SEULE arête par couple de stations consécutives
 contrairement aux versions précédentes qui créaient une arête par passage de métro.
 """
 
+import itertools
 import pickle
 import sqlite3
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, NamedTuple, Tuple, Set
 import logging
 from pathlib import Path
 import os
 import time
 
+from backend.utils.logger import normalize_text
+from backend.utils.pathfinding_kernel import to_csr
+
 # Configuration du logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Versions des graphes, uniques dans tout le processus: deux états de graphe (instances différentes,
+# reconstruction ou arêtes modifiées) n'ont jamais la même version, qui sert de clé aux caches
+_graph_versions = itertools.count(1)
+
+
+class SearchIndex(NamedTuple):
+    """
+    Représentation entière du graphe pour les recherches d'itinéraire.
+    Les stations sont numérotées dans l'ordre de tri de leurs identifiants et les lignes dans
+    l'ordre de tri de leurs noms: comparer les entiers départage comme le faisaient les chaînes.
+    """
+    names: List[str]  # id -> stop_id
+    ids: Dict[str, int]  # stop_id -> id
+    line_ids: Dict[str, int]  # nom court de ligne -> id
+    adj: List[List[int]]  # id -> voisins, dans l'ordre de adjacency
+    adj_lines: List[List[int]]  # id -> ligne de chaque arête de adj
+    station_pos: np.ndarray  # id -> position dans station_coordinates_rad() (-1 si pas de coordonnées)
+    indptr: np.ndarray  # adj au format CSR (int32), pour le noyau compilé
+    csr_neighbors: np.ndarray
+    csr_lines: np.ndarray
+
 
 class UniqueEdgesMetroGraph:
     def __init__(self, data_path: str):
@@ -26,17 +52,24 @@ class UniqueEdgesMetroGraph:
 
         # Graphe avec arêtes uniques
         self.stations = {}  # stop_id -> {name, lat, lon, ...}
+        self.normalized_names = {}  # stop_id -> nom sans accents en minuscules, pour valider les correspondances
         self.unique_edges = {}  # (stop_id1, stop_id2, route_id) -> edge_data
         self.transfers = {}  # stop_id -> [connected_stop_ids]
 
         # Pour l'algorithme de recherche d'itinéraire
         self.nodes = set()  # Ensemble des identifiants de stations
         self.adjacency = {}  # Dictionnaire d'adjacence: stop_id -> {voisin: (route_id, coût)}
+        self.edge_line = {}  # (stop_id, voisin) -> nom court de la ligne, pour la recherche d'itinéraire
         self.temp_edges_backup = {}  # Sauvegarde des arêtes temporairement supprimées
+        self.version = next(_graph_versions)  # Renouvelée à chaque construction ou modification des arêtes
 
         # Cache des données
         self._routes_cache = None
         self._stops_cache = None
+        self._station_edges = None  # stop_id -> [(autre extrémité, route_id, edge_data)], construit à la demande
+        self._station_coords_rad = None  # (index stop_id -> position, lat, lon, cos(lat)) en radians
+        self._station_trig = None  # stop_id -> (lat, cos(lat), lon) en radians
+        self._search_index = None  # SearchIndex, construit à la demande
 
         logger.info(f"Initialisation du graphe avec arêtes uniques - Cache: {self.cache_dir}")
 
@@ -157,6 +190,10 @@ class UniqueEdgesMetroGraph:
 
         # Charger les fichiers stop_times.txt et trips.txt si non présents dans le cache
         self._prepare_cache_data()
+        self._station_edges = None
+        self._station_coords_rad = None
+        self._station_trig = None
+        self._search_index = None
 
         # Charger les arêtes uniques (depuis le cache ou les calculer)
         unique_edges_set = self._get_unique_edges_from_stop_times()
@@ -192,6 +229,7 @@ class UniqueEdgesMetroGraph:
                     'lon': stop['stop_lon'],
                     'location_type': stop['location_type'],
                 }
+                self.normalized_names[stop['stop_id']] = normalize_text(stop['stop_name']).lower()
 
                 # Créer un nœud dans le graphe pour cette station
                 self.nodes.add(stop['stop_id'])
@@ -307,6 +345,18 @@ class UniqueEdgesMetroGraph:
         if nodes_to_remove:
             logger.info(f"Nœuds isolés supprimés: {len(nodes_to_remove)}")
 
+        # 10. Ligne de chaque arête orientée, résolue une fois par route_id
+        # (évite un filtrage du DataFrame des routes à chaque arête relâchée)
+        route_names = {}
+        self.edge_line = {}
+        for from_stop, neighbors in self.adjacency.items():
+            for to_stop, (route_id, _) in neighbors.items():
+                if route_id not in route_names:
+                    route_names[route_id] = self._get_route_short_name(route_id)
+                self.edge_line[(from_stop, to_stop)] = route_names[route_id]
+
+        self.version = next(_graph_versions)
+
         total_time = time.time() - start_time
         logger.info(f"=== Graphe construit en {total_time:.2f}s ===")
         logger.info(f"Stations: {len(self.stations)}")
@@ -316,28 +366,53 @@ class UniqueEdgesMetroGraph:
         logger.info(
             f"Nombre moyen de voisins par nœud: {sum(len(adj) for adj in self.adjacency.values()) / len(self.adjacency) if self.adjacency else 0:.2f}")
 
+    def _edges_of(self, stop_id: str) -> List[Tuple[str, str, Dict]]:
+        """
+        Arêtes uniques touchant une station, dans l'ordre de unique_edges.
+        L'index est construit une fois (O(|E|)) puis chaque accès est en O(degré).
+        """
+        if self._station_edges is None:
+            index = {}
+            for (stop1, stop2, route_id), edge_data in self.unique_edges.items():
+                index.setdefault(stop1, []).append((stop2, route_id, edge_data))
+                if stop2 != stop1:
+                    index.setdefault(stop2, []).append((stop1, route_id, edge_data))
+            self._station_edges = index
+        return self._station_edges.get(stop_id, ())
+
+    def station_coordinates_rad(self) -> Tuple[Dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Coordonnées des stations en radians, en tableaux NumPy indexés par position.
+        Retourne (index stop_id -> position, lat, lon, cos(lat)), calculés une seule fois
+        pour que l'heuristique A* se calcule vers toutes les stations en quelques opérations vectorisées.
+        """
+        if self._station_coords_rad is None:
+            index = {stop_id: i for i, stop_id in enumerate(self.stations)}
+            lat = np.radians(np.fromiter((s['lat'] for s in self.stations.values()), dtype=np.float64, count=len(index)))
+            lon = np.radians(np.fromiter((s['lon'] for s in self.stations.values()), dtype=np.float64, count=len(index)))
+            self._station_coords_rad = (index, lat, lon, np.cos(lat))
+        return self._station_coords_rad
+
+    def station_trig(self) -> Dict[str, Tuple[float, float, float]]:
+        """stop_id -> (lat, cos(lat), lon) en radians, pour les calculs de distance un à un"""
+        if self._station_trig is None:
+            index, lat, lon, cos_lat = self.station_coordinates_rad()
+            self._station_trig = dict(zip(index, zip(lat.tolist(), cos_lat.tolist(), lon.tolist())))
+        return self._station_trig
+
     def get_station_connections(self, stop_id: str) -> List[Dict]:
         """Retourne toutes les connexions d'une station (arêtes + transferts)."""
-        connections = []
-
         # Connexions directes (arêtes)
-        for (stop1, stop2, route_id), edge_data in self.unique_edges.items():
-            if stop1 == stop_id:
-                connections.append({
-                    'to_stop': stop2,
-                    'type': 'direct',
-                    'route_id': route_id,
-                    'route_info': edge_data['route_info'],
-                    'travel_time': edge_data['travel_time']
-                })
-            elif stop2 == stop_id:
-                connections.append({
-                    'to_stop': stop1,
-                    'type': 'direct',
-                    'route_id': route_id,
-                    'route_info': edge_data['route_info'],
-                    'travel_time': edge_data['travel_time']
-                })
+        connections = [
+            {
+                'to_stop': other,
+                'type': 'direct',
+                'route_id': route_id,
+                'route_info': edge_data['route_info'],
+                'travel_time': edge_data['travel_time']
+            }
+            for other, route_id, edge_data in self._edges_of(stop_id)
+        ]
 
         # Transferts
         if stop_id in self.transfers:
@@ -353,19 +428,17 @@ class UniqueEdgesMetroGraph:
 
     def find_direct_connection(self, from_stop: str, to_stop: str) -> List[Dict]:
         """Trouve les connexions directes entre deux stations."""
-        connections = []
-
-        # Rechercher dans les arêtes uniques
-        for (stop1, stop2, route_id), edge_data in self.unique_edges.items():
-            if (stop1 == from_stop and stop2 == to_stop) or (stop1 == to_stop and stop2 == from_stop):
-                connections.append({
-                    'route_id': route_id,
-                    'route_info': edge_data['route_info'],
-                    'travel_time': edge_data['travel_time'],
-                    'distance': edge_data['distance']
-                })
-
-        return connections
+        # Rechercher parmi les arêtes de la station de départ uniquement
+        return [
+            {
+                'route_id': route_id,
+                'route_info': edge_data['route_info'],
+                'travel_time': edge_data['travel_time'],
+                'distance': edge_data['distance']
+            }
+            for other, route_id, edge_data in self._edges_of(from_stop)
+            if other == to_stop
+        ]
 
     def get_all_edges_for_geojson(self) -> List[Dict]:
         """Retourne toutes les arêtes pour la génération de GeoJSON."""
@@ -473,9 +546,34 @@ class UniqueEdgesMetroGraph:
             return list(self.adjacency[node_id].keys())
         return []
 
+    def search_index(self) -> SearchIndex:
+        """Index entier du graphe (voir SearchIndex), reconstruit après toute modification de l'adjacence."""
+        if self._search_index is None:
+            names = sorted(set(self.adjacency).union(*self.adjacency.values()))
+            ids = {stop_id: i for i, stop_id in enumerate(names)}
+            edges = [(ids[from_id], ids[to_id], self.get_line_between_stations(from_id, to_id))
+                     for from_id, neighbors in self.adjacency.items() for to_id in neighbors]
+            line_ids = {line: i for i, line in enumerate(sorted({line for _, _, line in edges}))}
+
+            adj = [[] for _ in names]
+            adj_lines = [[] for _ in names]
+            for from_id, to_id, line in edges:
+                adj[from_id].append(to_id)
+                adj_lines[from_id].append(line_ids[line])
+
+            coords_index = self.station_coordinates_rad()[0]
+            station_pos = np.array([coords_index.get(stop_id, -1) for stop_id in names], dtype=np.intp)
+            self._search_index = SearchIndex(names, ids, line_ids, adj, adj_lines, station_pos,
+                                             *to_csr(adj, adj_lines))
+        return self._search_index
+
     def get_line_between_stations(self, from_id: str, to_id: str) -> str:
         """Retourne l'identifiant de ligne entre deux stations."""
         if from_id in self.adjacency and to_id in self.adjacency[from_id]:
+            line = self.edge_line.get((from_id, to_id))
+            if line is not None:
+                return line
+            # Arête absente de l'index (ajoutée après build_graph)
             route_id, _ = self.adjacency[from_id][to_id]
             logger.debug(f"Connexion {from_id} -> {to_id}: route_id = {route_id}")
             # Extraire le numéro/lettre de ligne à partir du route_id
@@ -494,8 +592,9 @@ class UniqueEdgesMetroGraph:
         total_co2 = 0.0
         found = False
 
-        for (s1, s2, route_id), edge_data in self.unique_edges.items():
-            if {s1, s2} == {stop1, stop2}:  # Connexion dans les deux sens
+        # Arêtes de stop1 via l'index par station (même ordre que unique_edges), dans les deux sens
+        for other, route_id, edge_data in self._edges_of(stop1):
+            if other == stop2:
                 co2 = edge_data.get("co2", 0.0)
                 total_co2 += co2
                 found = True
@@ -526,10 +625,18 @@ class UniqueEdgesMetroGraph:
 
     def get_station_name(self, stop_id: str) -> str:
         """Récupère le nom d'une station à partir de son identifiant."""
-        if stop_id in self.stations:
-            return self.stations[stop_id]['name']
+        station = self.stations.get(stop_id)
+        if station is not None:
+            return station['name']
         return stop_id  # Retourne l'ID si nom non trouvé
 
+    def get_normalized_name(self, stop_id: str) -> str:
+        """Nom de la station sans accents et en minuscules (calculé à la construction du graphe)."""
+        normalized = self.normalized_names.get(stop_id)
+        if normalized is None:
+            normalized = normalize_text(self.get_station_name(stop_id)).lower()
+        return normalized
+
     def find_station_by_name(self, name_query: str) -> List[str]:
         """
         Recherche une station par nom avec correspondance floue améliorée.
@@ -602,6 +709,8 @@ class UniqueEdgesMetroGraph:
 
             # Supprimer l'arête
             del self.adjacency[from_id][to_id]
+            self._search_index = None
+            self.version = next(_graph_versions)
 
     def restore_edges(self, node_id: str, neighbors: dict):
         """
@@ -610,6 +719,8 @@ class UniqueEdgesMetroGraph:
         if node_id in self.temp_edges_backup:
             for neighbor, edge_data in self.temp_edges_backup[node_id].items():
                 self.adjacency[node_id][neighbor] = edge_data
+            self._search_index = None
+            self.version = next(_graph_versions)
 
             # Supprimer la sauvegarde
             del self.temp_edges_backup[node_id]
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 import requests
 import json
 from unidecode import unidecode
-from starlette.responses import JSONResponse
+from backend.utils.responses import ORJSONResponse
 
 import logging
 
@@ -76,4 +76,4 @@ def get_ratp_disruptions():
     filtered = filter_metro_rer(raw)
     logger.info(f"🟢 {len(filtered['disruptions'])} perturbations retenues (métro/RER)")
     logger.info(f"🟢 {len(filtered['lines'])} lignes retenues (métro/RER)")
-    return JSONResponse(content=filtered)
+    return ORJSONResponse(filtered)
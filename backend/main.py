@@ -1,6 +1,8 @@
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
 from backend.graph.GeoJsonification import graph_nodes_to_geojson
 from backend.graph.GeoJsonification_with_edges import (
     graph_to_geojson_with_edges,
@@ -14,14 +16,24 @@ from backend.graph.optimized_graph import OptimizedGraphGTFS
 from backend.graph.ultra_optimized_graph import UltraOptimizedGraphGTFS
 from backend.graph.unique_edges_graph import UniqueEdgesMetroGraph
 from backend.utils.logger import log_info, log_warning, log_error
+from backend.utils.responses import (
+    ORJSONResponse, dumps, make_etag, cacheable_response,
+    wants_msgpack, msgpack_dumps, MSGPACK_MEDIA_TYPE, MSGPACK_AVAILABLE, GEOJSON_MEDIA_TYPE
+)
+import itertools
 import time
 import logging
 import sqlite3
+import threading
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from cachetools import TTLCache
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 app.include_router(line_reports_router)
 app.include_router(routes_router)
 
@@ -32,6 +44,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Les GeoJSON (clés répétées) se compressent très bien
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Instance globale du graphe avec arêtes uniques (nouvelle version optimisée)
 unique_graph = None
@@ -100,6 +114,25 @@ def get_ultra_graph():
     return ultra_graph
 
 
+@lru_cache(maxsize=1)
+def get_graphe_gtfs():
+    """Instance partagée de GrapheGTFS (chargement complet, fait une seule fois)"""
+    return GrapheGTFS("backend/graph/IDFM-gtfs_metro_pkl")
+
+
+@lru_cache(maxsize=1)
+def get_optimized_graph():
+    """Instance partagée de OptimizedGraphGTFS pour le filtrage par zone"""
+    return OptimizedGraphGTFS("backend/graph/IDFM-gtfs_metro_pkl")
+
+
+async def get_ultra_graph_async():
+    """Comme get_ultra_graph, mais le premier chargement (lent) se fait hors de la boucle d'événements"""
+    if ultra_graph is not None:
+        return ultra_graph
+    return await run_in_threadpool(get_ultra_graph)
+
+
 @app.get("/api/hello")
 def read_root():
     return {"message": "Hello from FastAPI ultra-optimisé pour le métro parisien!"}
@@ -113,15 +146,13 @@ def get_stations_only():
     start_time = time.time()
 
     try:
-        logger.info("Récupération des stations uniquement...")
-
         g = get_ultra_graph()
         graph = g.build_stations_only_graph()
 
         geojson_data = graph_nodes_to_geojson(graph)
 
         total_time = time.time() - start_time
-        logger.info(f"Stations chargées en {total_time:.2f} secondes")
+        logger.info("stations_only t=%.2fs nodes=%d", total_time, len(graph.nodes))
 
         if isinstance(geojson_data, dict):
             geojson_data["metadata"] = {
@@ -130,7 +161,7 @@ def get_stations_only():
                 "type": "stations_only"
             }
 
-        return JSONResponse(content=geojson_data)
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -152,8 +183,6 @@ def get_graph_zone(
     start_time = time.time()
 
     try:
-        logger.info(f"Construction du graphe complet pour zone: [{lat_min},{lat_max}] x [{lon_min},{lon_max}]")
-
         g = get_ultra_graph()
 
         # Utiliser la méthode SQL si disponible, sinon fallback
@@ -165,7 +194,7 @@ def get_graph_zone(
         geojson_data = graph_nodes_to_geojson(graph)
 
         total_time = time.time() - start_time
-        logger.info(f"Graphe complet construit en {total_time:.2f} secondes")
+        logger.info("graph_zone t=%.2fs nodes=%d edges=%d", total_time, len(graph.nodes), len(graph.edges))
 
         if isinstance(geojson_data, dict):
             geojson_data["metadata"] = {
@@ -181,7 +210,7 @@ def get_graph_zone(
                 "type": "full_graph_with_edges"
             }
 
-        return JSONResponse(content=geojson_data)
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -191,34 +220,19 @@ def get_graph_zone(
 
 
 # Cache simple pour éviter de refaire les mêmes calculs trop souvent
-# Format: {'lat_min,lat_max,lon_min,lon_max': {'timestamp': ..., 'data': ...}}
-zone_cache = {}
+# Format: {(lat_min, lat_max, lon_min, lon_max) arrondis: bytes GeoJSON déjà sérialisés}
+# TTLCache gère l'expiration et l'éviction (LRU) tout seul
 MAX_CACHE_SIZE = 10  # Nombre maximum d'entrées dans le cache
 CACHE_TTL = 60  # Durée de vie du cache en secondes
+zone_cache = TTLCache(maxsize=MAX_CACHE_SIZE, ttl=CACHE_TTL)
+# L'endpoint tourne dans le threadpool et TTLCache n'est pas thread-safe
+# (get et l'écriture modifient ses liens LRU/expiration): accès sous verrou
+zone_cache_lock = threading.Lock()
 
 
-def clean_old_cache_entries():
-    """Nettoie les entrées trop anciennes ou si le cache est trop grand"""
-    global zone_cache
-    now = time.time()
-
-    # Supprimer les entrées trop anciennes
-    keys_to_remove = [
-        key for key, value in zone_cache.items()
-        if now - value['timestamp'] > CACHE_TTL
-    ]
-
-    for key in keys_to_remove:
-        del zone_cache[key]
-
-    # Si le cache est encore trop grand, supprimer les entrées les plus anciennes
-    if len(zone_cache) > MAX_CACHE_SIZE:
-        sorted_keys = sorted(
-            zone_cache.keys(),
-            key=lambda k: zone_cache[k]['timestamp']
-        )
-        for key in sorted_keys[:len(zone_cache) - MAX_CACHE_SIZE]:
-            del zone_cache[key]
+def _qk(x: float) -> float:
+    """Arrondi des coordonnées pour la clé de cache (4 décimales ≈ 11 m)"""
+    return round(x, 4)
 
 
 @app.get("/geo/stops")
@@ -230,20 +244,12 @@ def get_stops_geojson():
     start_time = time.time()
 
     try:
-        print("Début du chargement des stations de métro...")
-        g = GrapheGTFS("backend/graph/IDFM-gtfs_metro_pkl")  # double check this relative path!
-        print(f"GrapheGTFS chargé en {time.time() - start_time:.2f} secondes")
-
-        graph_start_time = time.time()
+        g = get_graphe_gtfs()
         graph = g.get_graph()
-        print(f"get_graph() exécuté en {time.time() - graph_start_time:.2f} secondes")
-
-        geojson_start_time = time.time()
         geojson_data = graph_nodes_to_geojson(graph)
-        print(f"Conversion GeoJSON exécutée en {time.time() - geojson_start_time:.2f} secondes")
 
         total_time = time.time() - start_time
-        print(f"Temps total de traitement: {total_time:.2f} secondes")
+        logger.info("geo_stops t=%.2fs nodes=%d", total_time, len(graph.nodes))
 
         # Ajouter des métadonnées au GeoJSON
         if isinstance(geojson_data, dict):
@@ -252,7 +258,7 @@ def get_stops_geojson():
                 "number_of_stations": len(geojson_data.get("features", []))
             }
 
-        return JSONResponse(content=geojson_data)
+        return geojson_data
     except Exception as e:
         total_time = time.time() - start_time
         error_message = f"Erreur après {total_time:.2f}s: {str(e)}"
@@ -261,15 +267,19 @@ def get_stops_geojson():
 
 
 @app.get("/api/stats")
-def get_system_stats():
+async def get_system_stats():
     """
     Obtient des statistiques détaillées sur le système de transport.
     """
     try:
-        g = get_ultra_graph()
+        g = await get_ultra_graph_async()
+        version = _graph_version(g)
+        cached = _cached_json(_system_stats_cache, version)
+        if cached is not None:
+            return cached
 
         if hasattr(g, 'get_statistics'):
-            stats = g.get_statistics()
+            stats = await run_in_threadpool(g.get_statistics)
         else:
             # Fallback pour les versions non-ultra
             stats = {
@@ -278,7 +288,7 @@ def get_system_stats():
                 "total_transfers": len(g.transfers) if hasattr(g, 'transfers') else 0
             }
 
-        return JSONResponse(content=stats)
+        return _store_json(_system_stats_cache, version, stats)
 
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des statistiques: {e}")
@@ -293,14 +303,20 @@ def clear_cache():
     try:
         g = get_ultra_graph()
 
-        if hasattr(g, 'clear_database'):
-            g.clear_database()
-            message = "Base de données supprimée avec succès"
-        elif hasattr(g, 'clear_cache'):
-            g.clear_cache()
-            message = "Cache supprimé avec succès"
-        else:
-            message = "Aucun cache à supprimer"
+        # Les connexions aux stations sont fermées avant la suppression du fichier,
+        # et aucune nouvelle ne s'ouvre tant qu'elle n'est pas terminée
+        with _stops_lock:
+            _reset_stops_cache()
+            if hasattr(g, 'clear_database'):
+                g.clear_database()
+                message = "Base de données supprimée avec succès"
+            elif hasattr(g, 'clear_cache'):
+                g.clear_cache()
+                message = "Cache supprimé avec succès"
+            else:
+                message = "Aucun cache à supprimer"
+            # Une lecture en cours pendant la suppression a pu remettre l'ancien contenu en cache
+            _reset_stops_cache()
 
         return {"message": message}
 
@@ -327,38 +343,27 @@ def get_stops_by_zone(
     start_time = time.time()
 
     try:
-        # Clé unique pour la zone actuelle
-        zone_key = f"{lat_min},{lat_max},{lon_min},{lon_max}"
-
-        # Vérifier si les données sont déjà dans le cache
-        if zone_key in zone_cache:
-            cached_data = zone_cache[zone_key]
-            print(f"Utilisation des données en cache pour la zone: {zone_key}")
-
-            # Vérifier si le cache est encore valide
-            if time.time() - cached_data['timestamp'] <= CACHE_TTL:
-                print("Données trouvées dans le cache, envoi des résultats...")
-                return JSONResponse(content=cached_data['data'])
-            else:
-                print("Les données en cache sont périmées, recalcul en cours...")
+        # Clé de la zone actuelle, arrondie pour que deux déplacements quasi identiques
+        # de la carte tombent sur la même entrée (le calcul utilise les valeurs exactes)
+        zone_key = (_qk(lat_min), _qk(lat_max), _qk(lon_min), _qk(lon_max))
 
-        print(f"Chargement optimisé des stations dans la zone: [{lat_min},{lon_min}] - [{lat_max},{lon_max}]")
+        # Vérifier si les données sont déjà dans le cache (les entrées expirées n'y sont plus)
+        with zone_cache_lock:
+            cached = zone_cache.get(zone_key)
+        if cached is not None:
+            return Response(cached, media_type="application/json")
 
         # Utiliser la version optimisée qui filtre dès le départ
-        g = OptimizedGraphGTFS("backend/graph/IDFM-gtfs_metro_pkl")
+        g = get_optimized_graph()
 
         # Charger seulement les stations dans la zone demandée
-        graph_load_time = time.time()
         graph = g.load_graph_for_zone(lat_min, lat_max, lon_min, lon_max)
-        print(f"Graphe optimise charge en {time.time() - graph_load_time:.2f} secondes")
 
         # Convertir en GeoJSON
-        geojson_start_time = time.time()
         geojson_data = graph_nodes_to_geojson(graph)
-        print(f"Conversion GeoJSON exécutée en {time.time() - geojson_start_time:.2f} secondes")
 
         total_time = time.time() - start_time
-        print(f"Temps total de traitement optimisé: {total_time:.2f} secondes")
+        logger.info("stops_by_zone t=%.2fs nodes=%d", total_time, len(graph.nodes))
 
         # Ajouter des métadonnées au GeoJSON
         if isinstance(geojson_data, dict):
@@ -373,16 +378,12 @@ def get_stops_by_zone(
                 }
             }
 
-        # Mettre en cache les résultats
-        zone_cache[zone_key] = {
-            "timestamp": time.time(),
-            "data": geojson_data
-        }
-
-        # Nettoyer les anciennes entrées du cache si nécessaire
-        clean_old_cache_entries()
+        # Mettre en cache les résultats sérialisés
+        payload = dumps(geojson_data)
+        with zone_cache_lock:
+            zone_cache[zone_key] = payload
 
-        return JSONResponse(content=geojson_data)
+        return Response(payload, media_type="application/json")
     except Exception as e:
         total_time = time.time() - start_time
         error_message = f"Erreur après {total_time:.2f}s: {str(e)}"
@@ -404,8 +405,6 @@ def get_graph_with_edges(
     start_time = time.time()
 
     try:
-        logger.info(f"Construction du graphe avec arêtes pour zone: [{lat_min},{lat_max}] x [{lon_min},{lon_max}]")
-
         g = get_ultra_graph()
 
         # Construire le graphe pour la zone
@@ -418,7 +417,7 @@ def get_graph_with_edges(
         geojson_data = graph_to_geojson_with_edges(graph, include_edges=include_edges)
 
         total_time = time.time() - start_time
-        logger.info(f"Graphe avec arêtes construit en {total_time:.2f} secondes")
+        logger.info("graph_with_edges t=%.2fs nodes=%d edges=%d", total_time, len(graph.nodes), len(graph.edges))
 
         # Ajouter des métadonnées
         if isinstance(geojson_data, dict):
@@ -434,7 +433,7 @@ def get_graph_with_edges(
                 "type": "graph_with_edges"
             })
 
-        return JSONResponse(content=geojson_data)
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -454,8 +453,6 @@ def test_connection_between_stations(
     start_time = time.time()
 
     try:
-        logger.info(f"Test de connexion entre {station1} et {station2}")
-
         g = get_ultra_graph()
 
         # Construire un graphe large pour inclure les deux stations
@@ -470,7 +467,7 @@ def test_connection_between_stations(
         geojson_data = create_connection_test_geojson(graph, station1, station2)
 
         total_time = time.time() - start_time
-        logger.info(f"Test de connexion terminé en {total_time:.2f} secondes")
+        logger.info("test_connection %s->%s t=%.2fs", station1, station2, total_time)
 
         # Ajouter des métadonnées
         if isinstance(geojson_data, dict):
@@ -479,7 +476,7 @@ def test_connection_between_stations(
                 "type": "connection_test"
             })
 
-        return JSONResponse(content=geojson_data)
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -499,8 +496,6 @@ def get_station_connections(
     start_time = time.time()
 
     try:
-        logger.info(f"Recherche des connexions pour la station {station_id}")
-
         g = get_ultra_graph()
 
         # Construire un graphe large
@@ -513,7 +508,7 @@ def get_station_connections(
         geojson_data = find_connected_stations(graph, station_id, max_connections)
 
         total_time = time.time() - start_time
-        logger.info(f"Connexions trouvées en {total_time:.2f} secondes")
+        logger.info("station_connections %s t=%.2fs", station_id, total_time)
 
         # Ajouter des métadonnées
         if isinstance(geojson_data, dict):
@@ -522,7 +517,7 @@ def get_station_connections(
                 "type": "station_connections"
             })
 
-        return JSONResponse(content=geojson_data)
+        return ORJSONResponse(geojson_data)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -535,8 +530,155 @@ def get_station_connections(
 # NOUVEAUX ENDPOINTS POUR ARÊTES UNIQUES
 # ========================
 
+# Réponses pré-sérialisées (bytes orjson), invalidées quand la version du graphe change
+_edges_cache = {"version": None, "bytes": None, "etag": None, "media_type": GEOJSON_MEDIA_TYPE}
+_unique_stats_cache = {"version": None, "bytes": None, "etag": None}
+_connectivity_details_cache = {"version": None, "bytes": None, "etag": None}
+_connectivity_check_cache = {"version": None, "bytes": None, "etag": None}
+_system_stats_cache = {"version": None, "bytes": None, "etag": None}
+_network_stats_cache = {"version": None, "bytes": None, "etag": None}
+
+
+# Numéros des instances de graphe, uniques dans le processus: id(g) peut être réutilisé par un
+# graphe recréé après la libération de l'ancien, un numéro de ce compteur jamais
+_graph_tokens = itertools.count(1)
+
+
+def _graph_version(g):
+    """Jeton identifiant l'état du graphe: le numéro de l'instance et son compteur de reconstruction"""
+    token = getattr(g, "cache_token", None)
+    if token is None:
+        # Première utilisation de cette instance (graphe créé ou rechargé): nouveau numéro
+        token = g.cache_token = next(_graph_tokens)
+    return (token, getattr(g, "version", 0))
+
+
+def _cache_response(cache, request=None):
+    # Avec la requête, on ajoute ETag/Cache-Control et on gère le 304
+    if request is not None:
+        return cacheable_response(request, cache["bytes"], cache["etag"],
+                                  media_type=cache.get("media_type", "application/json"))
+    return Response(cache["bytes"], media_type=cache.get("media_type", "application/json"))
+
+
+def _cached_json(cache, version, request=None):
+    """Renvoie la Response mise en cache si elle correspond à la version, sinon None"""
+    if cache["version"] == version and cache["bytes"] is not None:
+        return _cache_response(cache, request)
+    return None
+
+
+def _store_json(cache, version, content, request=None):
+    """Sérialise une fois, mémorise les bytes et renvoie la Response"""
+    cache["bytes"] = dumps(content)
+    cache["etag"] = make_etag(cache["bytes"])
+    cache["version"] = version
+    return _cache_response(cache, request)
+
+
+class _EdgeFeature:
+    """
+    Feature LineString réduite à l'essentiel. Le dict GeoJSON complet n'est
+    construit qu'au moment de la sérialisation, via le hook default d'orjson.
+    """
+    __slots__ = ("geom_from", "geom_to", "props")
+
+    def __init__(self, geom_from, geom_to, props):
+        self.geom_from = geom_from
+        self.geom_to = geom_to
+        self.props = props
+
+
+def _feature_default(obj):
+    if isinstance(obj, _EdgeFeature):
+        return {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [obj.geom_from, obj.geom_to]},
+            "properties": obj.props
+        }
+    raise TypeError
+
+
+def _direct_feature(edge):
+    """Feature d'une arête directe (propriétés en un seul littéral, pas de .update())"""
+    return _EdgeFeature(edge['from_coords'], edge['to_coords'], {
+        "from_stop": edge['from_stop'],
+        "to_stop": edge['to_stop'],
+        "from_name": edge['from_name'],
+        "to_name": edge['to_name'],
+        "type": edge['type'],
+        "color": edge['color'],
+        "route_id": edge['route_id'],
+        "route_short_name": edge['route_info'].get('short_name', 'N/A'),
+        "travel_time": edge.get('travel_time', 120)  # Ajout du temps de trajet
+    })
+
+
+def _transfer_feature(edge):
+    """Feature d'une correspondance"""
+    return _EdgeFeature(edge['from_coords'], edge['to_coords'], {
+        "from_stop": edge['from_stop'],
+        "to_stop": edge['to_stop'],
+        "from_name": edge['from_name'],
+        "to_name": edge['to_name'],
+        "type": edge['type'],
+        "color": edge['color'],
+        "transfer_time": edge.get('transfer_time', 180)
+    })
+
+
+# Nombre de features sérialisées par appel à orjson
+_EDGES_BATCH_SIZE = 256
+
+# Une seule requête construit le GeoJSON des arêtes, les autres attendent le cache rempli
+_edges_lock = threading.Lock()
+
+
+def _unique_edges_chunks(edges, start_time):
+    """
+    Génère le GeoJSON des arêtes par morceaux (un en-tête, des lots de features,
+    puis les métadonnées), sans construire la collection complète en dicts.
+    """
+    yield b'{"type":"FeatureCollection","features":['
+
+    batch = []
+    direct_n = 0
+    transfer_n = 0
+    first = True
+    for edge in edges:
+        edge_type = edge['type']
+        if edge_type == 'direct':
+            batch.append(_direct_feature(edge))
+            direct_n += 1
+        elif edge_type == 'transfer':
+            batch.append(_transfer_feature(edge))
+            transfer_n += 1
+        else:
+            continue
+        if len(batch) >= _EDGES_BATCH_SIZE:
+            # Un seul appel orjson par lot; on retire les crochets de la liste
+            yield (b"" if first else b",") + dumps(batch, default=_feature_default)[1:-1]
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + dumps(batch, default=_feature_default)[1:-1]
+
+    total_time = time.time() - start_time
+    logger.info("unique_edges t=%.2fs edges=%d", total_time, len(edges))
+
+    # Ajouter des métadonnées
+    metadata = {
+        "total_edges": len(edges),
+        "direct_edges": direct_n,
+        "transfer_edges": transfer_n,
+        "processing_time": round(total_time, 2),
+        "type": "unique_edges"
+    }
+    yield b'],"metadata":' + dumps(metadata) + b'}'
+
+
 @app.get("/api/unique/edges")
-def get_unique_edges():
+def get_unique_edges(request: Request):
     """
     Endpoint pour obtenir toutes les arêtes uniques du graphe.
     Chaque couple de stations consécutives n'a qu'une seule arête par ligne.
@@ -544,64 +686,32 @@ def get_unique_edges():
     start_time = time.time()
 
     try:
-        logger.info("Récupération des arêtes uniques...")
-
         # Utiliser UltraOptimizedGraph au lieu de UniqueEdgesMetroGraph pour avoir les temps mis à jour
         g = get_ultra_graph()
         if g is None:
             raise HTTPException(status_code=500, detail="Graphe ultra-optimisé non disponible")
 
-        # Obtenir toutes les arêtes pour GeoJSON avec les temps de trajet mis à jour
-        edges = g.get_all_edges_for_geojson()
-
-        # Construire le GeoJSON
-        geojson_data = {
-            "type": "FeatureCollection",
-            "features": []
-        }
-
-        for edge in edges:
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [edge['from_coords'], edge['to_coords']]
-                },
-                "properties": {
-                    "from_stop": edge['from_stop'],
-                    "to_stop": edge['to_stop'],
-                    "from_name": edge['from_name'],
-                    "to_name": edge['to_name'],
-                    "type": edge['type'],
-                    "color": edge['color']
-                }
-            }
-
-            # Ajouter les infos spécifiques selon le type
-            if edge['type'] == 'direct':
-                feature['properties'].update({
-                    "route_id": edge['route_id'],
-                    "route_short_name": edge['route_info'].get('short_name', 'N/A'),
-                    "travel_time": edge.get('travel_time', 120)  # Ajout du temps de trajet
-                })
-            elif edge['type'] == 'transfer':
-                feature['properties']['transfer_time'] = edge.get('transfer_time', 180)
+        version = _graph_version(g)
+        cached = _cached_json(_edges_cache, version, request)
+        if cached is not None:
+            return cached
 
-            geojson_data['features'].append(feature)
+        # Le GeoJSON est construit entièrement avant de répondre: une erreur pendant la
+        # sérialisation donne un 500 ici, pas une réponse 200 interrompue en cours d'envoi
+        with _edges_lock:
+            # Une autre requête a pu remplir le cache pendant l'attente du verrou
+            cached = _cached_json(_edges_cache, version, request)
+            if cached is not None:
+                return cached
 
-        total_time = time.time() - start_time
-        logger.info(f"Aretes uniques recuperees en {total_time:.2f} secondes")
-
-        # Ajouter des métadonnées
-        geojson_data["metadata"] = {
-            "total_edges": len(edges),
-            "direct_edges": len([e for e in edges if e['type'] == 'direct']),
-            "transfer_edges": len([e for e in edges if e['type'] == 'transfer']),
-            "processing_time": round(total_time, 2),
-            "type": "unique_edges"
-        }
+            # Obtenir toutes les arêtes pour GeoJSON avec les temps de trajet mis à jour
+            edges = g.get_all_edges_for_geojson()
+            payload = b"".join(_unique_edges_chunks(edges, start_time))
 
-        return JSONResponse(content=geojson_data)
+            _edges_cache["bytes"] = payload
+            _edges_cache["etag"] = make_etag(payload)
+            _edges_cache["version"] = version
+            return _cache_response(_edges_cache, request)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -618,8 +728,6 @@ def get_unique_station_connections(station_id: str):
     start_time = time.time()
 
     try:
-        logger.info(f"Récupération des connexions uniques pour {station_id}")
-
         g = get_unique_graph()
         if g is None:
             raise HTTPException(status_code=500, detail="Graphe avec arêtes uniques non disponible")
@@ -632,25 +740,35 @@ def get_unique_station_connections(station_id: str):
         connections = g.get_station_connections(station_id)
         station_info = g.stations[station_id]
 
+        # Comptage par type en une seule passe
+        direct_n = 0
+        transfer_n = 0
+        for connection in connections:
+            connection_type = connection['type']
+            if connection_type == 'direct':
+                direct_n += 1
+            elif connection_type == 'transfer':
+                transfer_n += 1
+
         result = {
             "station_id": station_id,
             "station_name": station_info['name'],
             "station_coords": [station_info['lon'], station_info['lat']],
             "connections": connections,
             "total_connections": len(connections),
-            "direct_connections": len([c for c in connections if c['type'] == 'direct']),
-            "transfer_connections": len([c for c in connections if c['type'] == 'transfer'])
+            "direct_connections": direct_n,
+            "transfer_connections": transfer_n
         }
 
         total_time = time.time() - start_time
-        logger.info(f"Connexions uniques recuperees en {total_time:.2f} secondes")
+        logger.info("unique_station_connections %s t=%.2fs n=%d", station_id, total_time, len(connections))
 
         result["metadata"] = {
             "processing_time": round(total_time, 2),
             "type": "unique_station_connections"
         }
 
-        return JSONResponse(content=result)
+        return result
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -670,8 +788,6 @@ def test_unique_connection(
     start_time = time.time()
 
     try:
-        logger.info(f"Test de connexion unique entre {from_stop} et {to_stop}")
-
         g = get_unique_graph()
         if g is None:
             raise HTTPException(status_code=500, detail="Graphe avec arêtes uniques non disponible")
@@ -696,14 +812,14 @@ def test_unique_connection(
         }
 
         total_time = time.time() - start_time
-        logger.info(f"Test de connexion unique terminé en {total_time:.2f} secondes")
+        logger.info("unique_connection %s->%s t=%.2fs n=%d", from_stop, to_stop, total_time, len(connections))
 
         result["metadata"] = {
             "processing_time": round(total_time, 2),
             "type": "unique_connection_test"
         }
 
-        return JSONResponse(content=result)
+        return result
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -720,39 +836,38 @@ def get_unique_graph_stats():
     start_time = time.time()
 
     try:
-        logger.info("Récupération des statistiques du graphe avec arêtes uniques")
-
         g = get_unique_graph()
         if g is None:
             raise HTTPException(status_code=500, detail="Graphe avec arêtes uniques non disponible")
 
-        # Analyser les arêtes par type
-        direct_edges = [e for e in g.unique_edges.values()]
-        route_counts = {}
+        version = _graph_version(g)
+        cached = _cached_json(_unique_stats_cache, version)
+        if cached is not None:
+            return cached
 
-        for edge in direct_edges:
-            route_info = edge['route_info']
-            route_name = route_info.get('short_name', 'Unknown')
-            route_counts[route_name] = route_counts.get(route_name, 0) + 1
+        # Analyser les arêtes par ligne
+        route_counts = Counter(
+            edge['route_info'].get('short_name', 'Unknown') for edge in g.unique_edges.values()
+        )
 
         result = {
             "total_stations": len(g.stations),
             "total_unique_edges": len(g.unique_edges),
             "total_transfers": len(g.transfers),
-            "stations_with_transfers": len([s for s in g.transfers if g.transfers[s]]),
+            "stations_with_transfers": sum(1 for transfers in g.transfers.values() if transfers),
             "edges_by_route": route_counts,
             "total_routes": len(route_counts)
         }
 
         total_time = time.time() - start_time
-        logger.info(f"Statistiques recuperees en {total_time:.2f} secondes")
+        logger.info("unique_stats t=%.2fs", total_time)
 
         result["metadata"] = {
             "processing_time": round(total_time, 2),
             "type": "unique_graph_stats"
         }
 
-        return JSONResponse(content=result)
+        return _store_json(_unique_stats_cache, version, result)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -762,18 +877,22 @@ def get_unique_graph_stats():
 
 
 @app.get("/api/connectivity/check")
-def check_network_connectivity():
+async def check_network_connectivity():
     """
     Vérifie si le réseau de transport est connexe.
     Retourne un booléen indiquant si toutes les stations sont accessibles.
+    Le résultat est partagé par tous les clients tant que le graphe ne change pas.
     """
     start_time = time.time()
 
     try:
-        logger.info("🔍 Vérification de la connexité du réseau...")
+        g = await get_ultra_graph_async()
+        version = _graph_version(g)
+        cached = _cached_json(_connectivity_check_cache, version)
+        if cached is not None:
+            return cached
 
-        g = get_ultra_graph()
-        is_connected = g.connected()
+        is_connected = await run_in_threadpool(g.connected)
 
         total_time = time.time() - start_time
 
@@ -784,9 +903,9 @@ def check_network_connectivity():
             "status": "success" if is_connected else "warning"
         }
 
-        logger.info(f"✅ Vérification terminée en {total_time:.2f}s: {'Connexe' if is_connected else 'Non connexe'}")
+        logger.info("connectivity_check t=%.2fs connected=%s", total_time, is_connected)
 
-        return JSONResponse(content=result)
+        return _store_json(_connectivity_check_cache, version, result)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -796,7 +915,7 @@ def check_network_connectivity():
 
 
 @app.get("/api/connectivity/details")
-def get_connectivity_details():
+async def get_connectivity_details():
     """
     Retourne des détails complets sur la connexité du réseau.
     Inclut le nombre de composantes connexes, les nœuds isolés, etc.
@@ -804,17 +923,20 @@ def get_connectivity_details():
     start_time = time.time()
 
     try:
-        logger.info("📊 Analyse détaillée de la connexité...")
+        g = await get_ultra_graph_async()
+        version = _graph_version(g)
+        cached = _cached_json(_connectivity_details_cache, version)
+        if cached is not None:
+            return cached
 
-        g = get_ultra_graph()
-        details = g.get_connectivity_details()
+        details = await run_in_threadpool(g.get_connectivity_details)
 
         total_time = time.time() - start_time
         details["processing_time"] = round(total_time, 2)
 
-        logger.info(f"📊 Analyse terminée en {total_time:.2f}s")
+        logger.info("connectivity_details t=%.2fs", total_time)
 
-        return JSONResponse(content=details)
+        return _store_json(_connectivity_details_cache, version, details)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -824,22 +946,25 @@ def get_connectivity_details():
 
 
 @app.get("/api/stats")
-def get_network_stats():
+async def get_network_stats():
     """
     Retourne des statistiques générales sur le réseau.
     """
     start_time = time.time()
 
     try:
-        logger.info("📈 Récupération des statistiques du réseau...")
+        g = await get_ultra_graph_async()
+        version = _graph_version(g)
+        cached = _cached_json(_network_stats_cache, version)
+        if cached is not None:
+            return cached
 
-        g = get_ultra_graph()
-        stats = g.get_statistics()
+        stats = await run_in_threadpool(g.get_statistics)
 
         total_time = time.time() - start_time
         stats["processing_time"] = round(total_time, 2)
 
-        return JSONResponse(content=stats)
+        return _store_json(_network_stats_cache, version, stats)
 
     except Exception as e:
         total_time = time.time() - start_time
@@ -848,51 +973,149 @@ def get_network_stats():
         raise HTTPException(status_code=500, detail=error_message)
 
 
+# Base SQLite des stations, cherchée une seule fois au chargement du module
+# (depuis la racine du projet ou depuis backend/)
+_DB_PATH = next(
+    (str(p) for p in (Path("backend/graph/IDFM-gtfs_metro_pkl/metro_graph.db"),
+                      Path("graph/IDFM-gtfs_metro_pkl/metro_graph.db")) if p.is_file()),
+    None
+)
+
+
+# Connexions ouvertes par _stops_connection, fermées par _reset_stops_cache avant que
+# /api/clear_cache supprime la base (Windows refuse de supprimer un fichier ouvert,
+# et immutable=1 suppose que le fichier ne change pas tant que la connexion vit)
+_stops_connections = []
+_stops_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2)
+def _stops_connection(db_path: str) -> sqlite3.Connection:
+    """Connexion SQLite partagée, en lecture seule (la table stops ne change qu'avec /api/clear_cache)"""
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro&immutable=1"
+    with _stops_lock:
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        _stops_connections.append(conn)
+    conn.text_factory = str  # décodage UTF-8 fait en C par sqlite3
+    conn.execute("PRAGMA query_only = 1")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    return conn
+
+
+@lru_cache(maxsize=2)
+def _fetch_stops(db_path: str) -> tuple:
+    """Liste triée des (stop_id, stop_name), lue une seule fois par base"""
+    # Le nettoyage des noms est fait côté SQL (TRIM), pas de traitement par ligne en Python
+    return tuple(_stops_connection(db_path).execute(
+        "SELECT stop_id, TRIM(stop_name) AS n FROM stops ORDER BY n"
+    ))
+
+
+@lru_cache(maxsize=2)
+def _fetch_stops_examples(db_path: str) -> tuple:
+    """Quelques stations d'exemple pour /api/stops/count"""
+    return tuple(_stops_connection(db_path).execute(
+        "SELECT stop_id, stop_name FROM stops LIMIT 5"
+    ).fetchall())
+
+
+@lru_cache(maxsize=2)
+def _stops_bytes(db_path: str) -> bytes:
+    """Réponse {"stops": [...]} sérialisée une fois pour toutes"""
+    return dumps({"stops": [{"stop_id": stop_id, "stop_name": stop_name}
+                            for stop_id, stop_name in _fetch_stops(db_path)]})
+
+
+@lru_cache(maxsize=2)
+def _stops_etag(db_path: str) -> str:
+    return make_etag(_stops_bytes(db_path))
+
+
+@lru_cache(maxsize=2)
+def _stops_msgpack_bytes(db_path: str) -> bytes:
+    """Même contenu que _stops_bytes, en MessagePack (plus compact pour les clients mobiles)"""
+    return msgpack_dumps({"stops": [{"stop_id": stop_id, "stop_name": stop_name}
+                                    for stop_id, stop_name in _fetch_stops(db_path)]})
+
+
+@lru_cache(maxsize=2)
+def _stops_msgpack_etag(db_path: str) -> str:
+    return make_etag(_stops_msgpack_bytes(db_path))
+
+
+def _stops_response(request: Request, db_path: str) -> Response:
+    """Liste des stations en JSON, ou en MessagePack si le client l'accepte"""
+    if wants_msgpack(request):
+        return cacheable_response(request, _stops_msgpack_bytes(db_path), _stops_msgpack_etag(db_path),
+                                  media_type=MSGPACK_MEDIA_TYPE, vary="Accept")
+    return cacheable_response(request, _stops_bytes(db_path), _stops_etag(db_path), vary="Accept")
+
+
+@lru_cache(maxsize=2)
+def _stops_count_bytes(db_path: str) -> bytes:
+    return dumps({
+        "count": len(_fetch_stops(db_path)),
+        "examples": [{"stop_id": row[0], "stop_name": row[1]} for row in _fetch_stops_examples(db_path)],
+        "db_path": db_path
+    })
+
+
+def _reset_stops_cache():
+    """Ferme les connexions partagées et oublie les stations lues et sérialisées (appelé sous _stops_lock)"""
+    _stops_connection.cache_clear()
+    _fetch_stops.cache_clear()
+    _fetch_stops_examples.cache_clear()
+    _stops_bytes.cache_clear()
+    _stops_etag.cache_clear()
+    _stops_msgpack_bytes.cache_clear()
+    _stops_msgpack_etag.cache_clear()
+    _stops_count_bytes.cache_clear()
+    while _stops_connections:
+        _stops_connections.pop().close()
+
+
+# Liste des principales stations de métro parisien (secours si la base SQLite pose problème)
+_BASIC_STOPS = [
+    {"stop_id": "RATPI_1", "stop_name": "Château de Vincennes"},
+    {"stop_id": "RATPI_2", "stop_name": "Nation"},
+    {"stop_id": "RATPI_3", "stop_name": "Gare de Lyon"},
+    {"stop_id": "RATPI_4", "stop_name": "Châtelet"},
+    {"stop_id": "RATPI_5", "stop_name": "Louvre-Rivoli"},
+    {"stop_id": "RATPI_6", "stop_name": "Champs-Élysées"},
+    {"stop_id": "RATPI_7", "stop_name": "Charles de Gaulle-Étoile"},
+    {"stop_id": "RATPI_8", "stop_name": "La Défense"},
+    {"stop_id": "RATPI_9", "stop_name": "Porte Dauphine"},
+    {"stop_id": "RATPI_10", "stop_name": "Porte de Clignancourt"},
+    {"stop_id": "RATPI_11", "stop_name": "Gare du Nord"},
+    {"stop_id": "RATPI_12", "stop_name": "Montparnasse-Bienvenüe"},
+    {"stop_id": "RATPI_13", "stop_name": "Saint-Lazare"},
+    {"stop_id": "RATPI_14", "stop_name": "Bastille"},
+    {"stop_id": "RATPI_15", "stop_name": "Place d'Italie"},
+    {"stop_id": "RATPI_16", "stop_name": "Denfert-Rochereau"},
+    {"stop_id": "RATPI_17", "stop_name": "Gare de l'Est"},
+    {"stop_id": "RATPI_18", "stop_name": "Opéra"},
+    {"stop_id": "RATPI_19", "stop_name": "République"},
+    {"stop_id": "RATPI_20", "stop_name": "Stalingrad"}
+]
+_BASIC_STOPS_BYTES = dumps({"stops": _BASIC_STOPS})
+_BASIC_STOPS_MSGPACK_BYTES = msgpack_dumps({"stops": _BASIC_STOPS}) if MSGPACK_AVAILABLE else None
+
 
 @app.get("/api/stops/list")
-def get_all_stops():
+def get_all_stops(request: Request):
     """
     API principale pour récupérer les stations de métro depuis metro_graph.db
     """
     try:
-        import os.path
-        
         # Utiliser directement la base de données SQLite
-        db_path = os.path.join("backend", "graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-        
-        if not os.path.exists(db_path):
-            # Essayer avec un autre chemin relatif
-            db_path = os.path.join("graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-            if not os.path.exists(db_path):
-                # Fallback vers la méthode avec le graphe
-                logger.warning("Base de données non trouvée, tentative avec le graphe...")
-                g = get_ultra_graph()
-                conn = sqlite3.connect(g.db_path)
-            else:
-                conn = sqlite3.connect(db_path)
-        else:
-            conn = sqlite3.connect(db_path)
-
-        stops = []
-        cursor = conn.cursor()
-        cursor.execute("SELECT stop_id, stop_name FROM stops ORDER BY stop_name")
-        rows = cursor.fetchall()
-
-        for row in rows:
-            stop_name = row[1]
-            # Nettoyer le nom de la station et gérer l'encodage
-            if isinstance(stop_name, bytes):
-                stop_name = stop_name.decode('utf-8', errors='replace')
-            stop_name = stop_name.strip()
-            
-            stops.append({
-                "stop_id": row[0],
-                "stop_name": stop_name
-            })
+        db_path = _DB_PATH
+        if db_path is None:
+            # Fallback vers la méthode avec le graphe
+            logger.warning("Base de données non trouvée, tentative avec le graphe...")
+            db_path = get_ultra_graph().db_path
 
-        conn.close()
-        logger.info(f"✅ {len(stops)} stations de métro récupérées avec succès")
-        return {"stops": stops}
+        logger.info("stops_list n=%d", len(_fetch_stops(db_path)))
+        return _stops_response(request, db_path)
 
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des stops: {e}")
@@ -900,86 +1123,31 @@ def get_all_stops():
     
 
 @app.get("/api/stops/basic")
-def get_basic_stops():
+def get_basic_stops(request: Request):
     """
     Une API simplifiée pour récupérer une liste de stations hardcodées
     à utiliser en cas d'erreur avec la base SQLite
     """
-    try:
-        # Liste des principales stations de métro parisien
-        stations = [
-            {"stop_id": "RATPI_1", "stop_name": "Château de Vincennes"},
-            {"stop_id": "RATPI_2", "stop_name": "Nation"},
-            {"stop_id": "RATPI_3", "stop_name": "Gare de Lyon"},
-            {"stop_id": "RATPI_4", "stop_name": "Châtelet"},
-            {"stop_id": "RATPI_5", "stop_name": "Louvre-Rivoli"},
-            {"stop_id": "RATPI_6", "stop_name": "Champs-Élysées"},
-            {"stop_id": "RATPI_7", "stop_name": "Charles de Gaulle-Étoile"},
-            {"stop_id": "RATPI_8", "stop_name": "La Défense"},
-            {"stop_id": "RATPI_9", "stop_name": "Porte Dauphine"},
-            {"stop_id": "RATPI_10", "stop_name": "Porte de Clignancourt"},
-            {"stop_id": "RATPI_11", "stop_name": "Gare du Nord"},
-            {"stop_id": "RATPI_12", "stop_name": "Montparnasse-Bienvenüe"},
-            {"stop_id": "RATPI_13", "stop_name": "Saint-Lazare"},
-            {"stop_id": "RATPI_14", "stop_name": "Bastille"},
-            {"stop_id": "RATPI_15", "stop_name": "Place d'Italie"},
-            {"stop_id": "RATPI_16", "stop_name": "Denfert-Rochereau"},
-            {"stop_id": "RATPI_17", "stop_name": "Gare de l'Est"},
-            {"stop_id": "RATPI_18", "stop_name": "Opéra"},
-            {"stop_id": "RATPI_19", "stop_name": "République"},
-            {"stop_id": "RATPI_20", "stop_name": "Stalingrad"}
-        ]
-        return {"stops": stations}
-    except Exception as e:
-        logger.error(f"Erreur lors de la récupération des stations basiques: {e}")
-        return {"stops": []}  # Renvoyer une liste vide en cas d'erreur
+    if wants_msgpack(request):
+        return Response(_BASIC_STOPS_MSGPACK_BYTES, media_type=MSGPACK_MEDIA_TYPE, headers={"Vary": "Accept"})
+    return Response(_BASIC_STOPS_BYTES, media_type="application/json", headers={"Vary": "Accept"})
     
 
 
 @app.get("/api/stops/all")
-def get_all_stops_from_db():
+def get_all_stops_from_db(request: Request):
     """
     API qui charge toutes les stations de métro directement depuis metro_graph.db
     """
     try:
-        import os.path
-        
         # Chemin vers la base de données SQLite des stations de métro
-        db_path = os.path.join("backend", "graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-        logger.info(f"Chargement des stations de métro depuis: {db_path}")
-
-        if not os.path.exists(db_path):
-            logger.error(f"Le fichier {db_path} n'existe pas!")
-            # Essayer avec un autre chemin relatif
-            db_path = os.path.join("graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-            if not os.path.exists(db_path):
-                raise FileNotFoundError(f"La base de données des stations de métro n'a pas été trouvée")
-        
-        stops = []
-        conn = sqlite3.connect(db_path)
-        # S'assurer que SQLite gère correctement l'encodage UTF-8
-        conn.execute("PRAGMA encoding = 'UTF-8'")
-        cursor = conn.cursor()
-        
+        db_path = _DB_PATH
+        if db_path is None:
+            raise FileNotFoundError("La base de données des stations de métro n'a pas été trouvée")
+
         # Récupérer toutes les stations de métro depuis la table stops
-        cursor.execute("SELECT stop_id, stop_name FROM stops ORDER BY stop_name")
-        rows = cursor.fetchall()
-
-        for row in rows:
-            stop_name = row[1]
-            # Nettoyer le nom de la station
-            if isinstance(stop_name, bytes):
-                stop_name = stop_name.decode('utf-8', errors='replace')
-            stop_name = stop_name.strip()
-            
-            stops.append({
-                "stop_id": row[0],
-                "stop_name": stop_name
-            })
-        
-        conn.close()
-        logger.info(f"✅ {len(stops)} stations de métro chargées avec succès depuis la base de données")
-        return {"stops": stops}
+        logger.info("stops_all n=%d db=%s", len(_fetch_stops(db_path)), db_path)
+        return _stops_response(request, db_path)
 
     except Exception as e:
         logger.error(f"Erreur lors du chargement des stations depuis la base de données: {e}")
@@ -993,33 +1161,12 @@ def get_stops_count():
     API pour vérifier le nombre de stations dans la base de données
     """
     try:
-        import os.path
-        
-        db_path = os.path.join("backend", "graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-        
-        if not os.path.exists(db_path):
-            db_path = os.path.join("graph", "IDFM-gtfs_metro_pkl", "metro_graph.db")
-            if not os.path.exists(db_path):
-                return {"error": "Base de données non trouvée", "count": 0}
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Compter le nombre de stations
-        cursor.execute("SELECT COUNT(*) FROM stops")
-        count = cursor.fetchone()[0]
-        
-        # Récupérer quelques exemples
-        cursor.execute("SELECT stop_id, stop_name FROM stops LIMIT 5")
-        examples = cursor.fetchall()
-        
-        conn.close()
-        
-        return {
-            "count": count,
-            "examples": [{"stop_id": row[0], "stop_name": row[1]} for row in examples],
-            "db_path": db_path
-        }
+        db_path = _DB_PATH
+        if db_path is None:
+            return {"error": "Base de données non trouvée", "count": 0}
+
+        # Nombre de stations et quelques exemples, pré-sérialisés
+        return Response(_stops_count_bytes(db_path), media_type="application/json")
 
     except Exception as e:
         logger.error(f"Erreur lors du comptage des stations: {e}")
@@ -1,19 +1,104 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import heapq
 import time
+from functools import lru_cache
 import logging
 import math
-from difflib import SequenceMatcher
+import re
+import numpy as np
 from datetime import datetime, timedelta
-from backend.utils.logger import log_info, log_warning, log_error, log_debug, normalize_text
+from backend.utils.fuzzy_search import create_user_friendly_error_message, suggest_station_alternatives
+from backend.utils.logger import log_info, log_warning, log_error, normalize_text
 from backend.utils.schedule_calculator import MetroScheduleCalculator
+from backend.utils.pathfinding_kernel import KERNEL_AVAILABLE, bucket_shortest_path_ids, shortest_path_ids
+from backend.utils.responses import dumps
+
+# rapidfuzz est optionnel: sans lui, la similarité des noms passe par difflib
+try:
+    from rapidfuzz.fuzz import ratio as fuzz_ratio
+except ImportError:
+    fuzz_ratio = None
 
 router = APIRouter(prefix="/api")
 
 # Configurer le logger standard pour ce module
 logger = logging.getLogger(__name__)
 
+# Distance des nœuds pas encore atteints (les tables de recherche sont creuses)
+INF = float('inf')
+
+# Heuristique A*: à 30 km/h un km prend 2 minutes, soit une station (2 minutes par arête de coût 1).
+# La conversion km -> coût vaut donc 60 / 30 / 2 = 1: le coût heuristique est la distance en km.
+HEURISTIC_COST_PER_KM = 60.0 / 30.0 / 2.0
+
+# Libellés de ligne qui ne désignent pas une ligne de métro (connexion à pied ou ligne inconnue)
+UNKNOWN_LINES = frozenset({"?", "transfer", "Correspondance"})
+
+# Numéro principal d'une ligne ("3", "3B", "7B"...), pour regrouper les variantes d'une même ligne
+LOGICAL_LINE_RE = re.compile(r'^(\d+[AB]?)')
+
+# Échelle des coûts entiers de la file à seaux: 1.0 -> 20, pénalités 0.2 -> 4, 0.15 -> 3, 0.05 -> 1
+COST_SCALE = 20
+
+
+class Step(NamedTuple):
+    """Connexion entre deux stations consécutives d'un chemin, avec sa ligne (process_routes_for_frontend)"""
+    frm: str
+    to: str
+    line: str
+    is_unknown: bool
+    inferred: bool = False
+
+
+class Segment:
+    """Portion d'un trajet sur une même ligne, ou correspondance à pied (process_routes_for_frontend)"""
+    __slots__ = ("line", "frm", "to", "stops", "is_transfer", "stations")
+
+    def __init__(self, line: str, frm: str, to: str, stops: int = 1, is_transfer: bool = False,
+                 stations: Optional[List[str]] = None):
+        self.line = line
+        self.frm = frm
+        self.to = to
+        self.stops = stops
+        self.is_transfer = is_transfer
+        self.stations = stations
+
+
+# Noyaux Numba utilisés par les recherches; désactivés par PathFinder.prepare s'ils ne donnent pas
+# les mêmes chemins que les boucles Python (voir PathFinder._check_kernels)
+_use_kernels = KERNEL_AVAILABLE
+
+# Version du graphe pour laquelle les caches de chemins sont valides (voir PathFinder._sync_path_cache)
+_cached_version = None
+
+
+@lru_cache(maxsize=512)
+def _same_logical_line(line1: str, line2: str) -> bool:
+    """
+    Vérifie si deux identifiants de ligne correspondent à la même ligne logique.
+    Mémorisée: il n'y a que quelques dizaines de lignes, les mêmes paires reviennent à chaque trajet.
+    """
+    result = False
+
+    if line1 == line2:
+        result = True
+    elif line1 and line2:
+        # Nettoyer les noms de ligne pour enlever les variations
+        clean_line1 = line1.replace("bis", "B").replace("Bis", "B")
+        clean_line2 = line2.replace("bis", "B").replace("Bis", "B")
+
+        # Extraire le numéro principal (exemple: "3", "3B", "7", "7B")
+        match1 = LOGICAL_LINE_RE.match(clean_line1)
+        match2 = LOGICAL_LINE_RE.match(clean_line2)
+
+        if match1 and match2:
+            result = match1.group(1) == match2.group(1)
+
+    return result
+
 
 class PathFinder:
     """
@@ -47,13 +132,24 @@ class PathFinder:
         dlat = lat2_rad - lat1_rad
         dlon = lon2_rad - lon1_rad
 
-        # Formule de Haversine
+        # Formule de Haversine (asin(sqrt(a)) équivaut à atan2(sqrt(a), sqrt(1 - a)) pour a dans [0, 1])
         a = (math.sin(dlat / 2) ** 2 +
              math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        c = 2 * math.asin(math.sqrt(a))
 
         return R * c
 
+    @staticmethod
+    def _haversine_trig(a_trig: Tuple[float, float, float], b_trig: Tuple[float, float, float]) -> float:
+        """
+        Haversine (en km) à partir de coordonnées précalculées (lat, cos(lat), lon) en radians,
+        voir graph.station_trig(): plus de conversion en radians ni de cosinus par appel.
+        """
+        s1 = math.sin((b_trig[0] - a_trig[0]) * 0.5)
+        s2 = math.sin((b_trig[2] - a_trig[2]) * 0.5)
+        a = s1 * s1 + a_trig[1] * b_trig[1] * s2 * s2
+        return 2 * 6371.0 * math.asin(math.sqrt(a))
+
     @staticmethod
     def _get_heuristic_cost(graph, current_station: str, target_station: str) -> float:
         """
@@ -66,33 +162,146 @@ class PathFinder:
             target_station: Station de destination
 
         Returns:
-            Coût heuristique (distance en km / vitesse moyenne estimée)
+            Coût heuristique, en nombre de stations (égal à la distance en km, voir HEURISTIC_COST_PER_KM)
         """
         try:
-            # Récupérer les coordonnées des stations
-            current_coords = graph.stations.get(current_station)
-            target_coords = graph.stations.get(target_station)
+            # Coordonnées précalculées des stations
+            station_trig = graph.station_trig()
+            current_trig = station_trig.get(current_station)
+            target_trig = station_trig.get(target_station)
 
-            if not current_coords or not target_coords:
+            if current_trig is None or target_trig is None:
                 return 0.0  # Heuristique nulle si pas de coordonnées
 
             # Distance géodésique en kilomètres
-            distance_km = PathFinder.haversine_distance(
-                current_coords['lat'], current_coords['lon'],
-                target_coords['lat'], target_coords['lon']
-            )
+            distance_km = PathFinder._haversine_trig(current_trig, target_trig)
 
-            # Estimation du temps basée sur vitesse moyenne du métro (30 km/h)
-            # et temps de correspondance moyen (2 minutes)
-            estimated_time = distance_km / 30 * 60  # en minutes
-
-            # Normaliser par rapport au coût unitaire d'une arête (2 minutes par station)
-            return estimated_time / 2.0
+            # Vitesse moyenne du métro (30 km/h), normalisée par le coût d'une arête (2 minutes)
+            return distance_km * HEURISTIC_COST_PER_KM
 
         except Exception as e:
             log_warning(f"Erreur dans le calcul heuristique: {e}")
             return 0.0
 
+    @staticmethod
+    def _heuristic_array(graph, target_station: str) -> np.ndarray:
+        """
+        Heuristique A* de toutes les stations vers la destination, en un seul calcul vectorisé.
+        Même formule que _get_heuristic_cost (Haversine, 30 km/h, 2 minutes par station),
+        mais la trigonométrie est faite par NumPy sur les tableaux précalculés du graphe.
+
+        Args:
+            graph: Instance du graphe
+            target_station: Station de destination
+
+        Returns:
+            Tableau des coûts heuristiques (en stations, soit des km), dans l'ordre de graph.station_coordinates_rad()
+        """
+        index, lat, lon, cos_lat = graph.station_coordinates_rad()
+        target = index.get(target_station)
+        if target is None:
+            return np.zeros(len(index))  # Heuristique nulle si pas de coordonnées
+
+        dlat = lat[target] - lat
+        dlon = lon[target] - lon
+        a = np.sin(dlat / 2) ** 2 + cos_lat * cos_lat[target] * np.sin(dlon / 2) ** 2
+        distance_km = 6371.0 * (2 * np.arcsin(np.sqrt(a)))
+        return distance_km * HEURISTIC_COST_PER_KM
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _node_heuristic(graph, target_station: str) -> np.ndarray:
+        """
+        Heuristique vers target_station pour chaque nœud de graph.search_index() (0 sans coordonnées).
+        Mise en cache: les deux A* de find_multiple_paths visent la même arrivée (tableau à ne pas modifier).
+        """
+        station_pos = graph.search_index().station_pos
+        # La position -1 tombe sur le 0 ajouté en fin de tableau
+        return np.append(PathFinder._heuristic_array(graph, target_station), 0.0)[station_pos]
+
+    @staticmethod
+    def prepare(graph) -> None:
+        """
+        Construit à l'avance ce que les recherches calculent à la demande: index entier et CSR,
+        coordonnées en radians, et compilation des noyaux Numba (sinon faite à la première requête).
+        """
+        index = graph.search_index()
+        graph.station_coordinates_rad()
+        graph.station_trig()
+        PathFinder._sync_path_cache(graph)
+
+        global _use_kernels
+        if _use_kernels and index.names:
+            # Une recherche triviale (départ = arrivée) suffit à compiler chaque noyau
+            PathFinder._compiled_search(index, np.zeros(len(index.names)), 0, 0, 0.2)
+            PathFinder._compiled_search(index, None, 0, 0, 0.15)
+
+            if not PathFinder._check_kernels(graph):
+                log_error("Les noyaux Numba ne donnent pas les mêmes chemins que Dijkstra en Python: "
+                          "ils sont désactivés")
+                _use_kernels = False
+                PathFinder.clear_path_cache()
+
+    @staticmethod
+    def _check_kernels(graph, samples: int = 8) -> bool:
+        """
+        Compare les deux noyaux Numba (tas et seaux) à la boucle Python de dijkstra_pathfinding
+        sur quelques couples de stations répartis dans l'index, pour chaque pénalité utilisée.
+        Un changement de comportement de Numba ne doit pas modifier les trajets sans prévenir.
+        """
+        index = graph.search_index()
+        n = len(index.names)
+        for i in range(min(samples, n)):
+            start_id = i * n // samples
+            end_id = (start_id + n // 2) % n
+            if start_id == end_id:
+                continue
+            start_station, end_station = index.names[start_id], index.names[end_id]
+
+            # (h, pénalité): h nul pour le noyau à tas, None pour la file à seaux
+            for h, penalty in ((np.zeros(n), 0.15), (None, 0.15), (None, 0.05), (None, 0.0)):
+                path, cost, _ = PathFinder._compiled_search(index, h, start_id, end_id, penalty)
+                expected = PathFinder.dijkstra_pathfinding(graph, start_station, end_station,
+                                                           _penalty_override=penalty, _compiled=False)
+                expected_path, expected_cost = (expected["path"], expected["distance"]) if expected else (None, INF)
+                if path != expected_path or (path is not None and abs(cost - expected_cost) > 1e-9):
+                    log_warning(f"Noyau Numba divergent pour {start_station} -> {end_station} "
+                                f"(pénalité {penalty}): coût {cost} au lieu de {expected_cost}")
+                    return False
+        return True
+
+    @staticmethod
+    def _compiled_search(index, h: Optional[np.ndarray], start_id: int, end_id: int, penalty: float):
+        """
+        Recherche via les noyaux Numba: A* si h est fourni, sinon Dijkstra.
+        Pour Dijkstra, si la pénalité tombe juste à l'échelle COST_SCALE, les coûts deviennent entiers
+        et la file à seaux (extraction en O(1)) remplace le tas.
+
+        Returns:
+            (chemin en stop_id ou None, coût, nœuds explorés)
+        """
+        transfer_line = index.line_ids.get("transfer", -2)
+        penalty_cost = round(penalty * COST_SCALE)
+        if h is None and abs(penalty_cost - penalty * COST_SCALE) < 1e-9:
+            came_from, cost, nodes_explored = bucket_shortest_path_ids(
+                index.indptr, index.csr_neighbors, index.csr_lines, start_id, end_id,
+                penalty, COST_SCALE, transfer_line)
+        else:
+            if h is None:
+                h = np.zeros(len(index.names))
+            came_from, cost, nodes_explored = shortest_path_ids(index.indptr, index.csr_neighbors, index.csr_lines,
+                                                                h, start_id, end_id, penalty, transfer_line)
+        if cost == INF:
+            return None, cost, nodes_explored
+
+        path = []
+        current = end_id
+        while current != -1:
+            path.append(index.names[current])
+            current = came_from[current]
+        path.reverse()
+        return path, float(cost), nodes_explored
+
     @staticmethod
     def a_star_pathfinding(graph, start_station: str, end_station: str,
                            prefer_line_continuity: bool = True) -> Optional[Dict[str, Any]]:
@@ -121,98 +330,109 @@ class PathFinder:
         if start_station == end_station:
             return {"path": [start_station], "distance": 0.0}
 
-        # Structures pour A*
-        # g_score: coût réel depuis le départ
-        g_score = {node: float('infinity') for node in graph.nodes}
-        g_score[start_station] = 0.0
+        # Structures pour A*, indexées par l'identifiant entier des stations (graph.search_index())
+        index = graph.search_index()
+        names, adj, adj_lines = index.names, index.adj, index.adj_lines
+        transfer_line = index.line_ids.get("transfer")
+        start_id = index.ids[start_station]
+        end_id = index.ids[end_station]
 
-        # f_score: g_score + heuristique
-        f_score = {node: float('infinity') for node in graph.nodes}
-        f_score[start_station] = PathFinder._get_heuristic_cost(graph, start_station, end_station)
+        # La destination est fixe pendant la recherche: h(n) est calculée pour toutes les stations d'un coup
+        h = PathFinder._node_heuristic(graph, end_station)
 
-        # Prédécesseurs pour reconstruction du chemin
-        came_from = {}
+        if _use_kernels:
+            path, cost, nodes_explored = PathFinder._compiled_search(index, h, start_id, end_id,
+                                                                     0.2 if prefer_line_continuity else 0.0)
+            if path is None:
+                logger.warning("A* n'a trouvé aucun chemin après avoir exploré %d nœuds", nodes_explored)
+                return None
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("A* trouvé un chemin en explorant %d nœuds", nodes_explored)
+            return {"path": path, "distance": cost}
 
-        # Ligne utilisée pour arriver à chaque nœud (pour pénaliser les changements)
-        previous_lines = {start_station: None}
+        h = h.tolist()
+
+        # g_score: coût réel depuis le départ
+        g_score = [INF] * len(names)
+        g_score[start_id] = 0.0
 
-        # File de priorité: (f_score, g_score, station, previous_line)
-        open_set = [(f_score[start_station], 0.0, start_station, None)]
+        # Prédécesseurs pour reconstruction du chemin (-1: aucun)
+        came_from = [-1] * len(names)
 
-        # Ensemble des stations visitées
-        closed_set = set()
+        # File de priorité: (f_score, g_score, station, previous_line), ligne -1 au départ
+        # Les identifiants suivent l'ordre de tri des noms: les égalités se départagent comme avant
+        open_set = [(h[start_id], 0.0, start_id, -1)]
+
+        # Stations visitées
+        closed = bytearray(len(names))
 
         # Statistiques de performance
         nodes_explored = 0
 
         while open_set:
             # Récupérer la station avec le plus petit f_score
-            current_f, current_g, current_station, current_line = heapq.heappop(open_set)
+            current_f, current_g, current, current_line = heapq.heappop(open_set)
 
             # Si station déjà visitée, ignorer
-            if current_station in closed_set:
+            if closed[current]:
                 continue
 
             # Marquer comme visitée
-            closed_set.add(current_station)
+            closed[current] = 1
             nodes_explored += 1
 
             # Si destination atteinte
-            if current_station == end_station:
-                log_info(f"A* trouvé un chemin en explorant {nodes_explored} nœuds")
+            if current == end_id:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("A* trouvé un chemin en explorant %d nœuds", nodes_explored)
 
                 # Reconstruction du chemin
                 path = []
-                current = current_station
-                while current in came_from:
-                    path.append(current)
+                while current != -1:
+                    path.append(names[current])
                     current = came_from[current]
-                path.append(start_station)
                 path.reverse()
 
                 return {
                     "path": path,
-                    "distance": g_score[end_station]
+                    "distance": g_score[end_id]
                 }
 
             # Explorer les voisins
-            for neighbor in graph.get_neighbors(current_station):
-                if neighbor in closed_set:
+            for neighbor, neighbor_line in zip(adj[current], adj_lines[current]):
+                if closed[neighbor]:
                     continue
 
                 # Coût de l'arête
-                neighbor_line = graph.get_line_between_stations(current_station, neighbor)
                 edge_cost = 1.0  # Coût de base
 
                 # Pénalité pour changement de ligne
-                if (prefer_line_continuity and current_line is not None and
-                        neighbor_line != current_line and neighbor_line != "transfer"):
+                if (prefer_line_continuity and current_line != -1 and
+                        neighbor_line != current_line and neighbor_line != transfer_line):
                     edge_cost += 0.2  # Pénalité modérée pour changement
 
                 # Calcul du nouveau g_score
-                tentative_g_score = g_score[current_station] + edge_cost
+                tentative_g_score = g_score[current] + edge_cost
 
                 # Si ce chemin est meilleur
                 if tentative_g_score < g_score[neighbor]:
                     # Enregistrer le meilleur chemin
-                    came_from[neighbor] = current_station
+                    came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
-                    previous_lines[neighbor] = neighbor_line
-
-                    # Calculer f_score avec heuristique
-                    h_cost = PathFinder._get_heuristic_cost(graph, neighbor, end_station)
-                    f_score[neighbor] = tentative_g_score + h_cost
 
-                    # Ajouter à la file de priorité
-                    heapq.heappush(open_set, (f_score[neighbor], tentative_g_score, neighbor, neighbor_line))
+                    # Ajouter à la file de priorité, avec f_score = g_score + heuristique
+                    heapq.heappush(open_set, (tentative_g_score + h[neighbor], tentative_g_score,
+                                              neighbor, neighbor_line))
 
         # Aucun chemin trouvé
-        log_warning(f"A* n'a trouvé aucun chemin après avoir exploré {nodes_explored} nœuds")
+        logger.warning("A* n'a trouvé aucun chemin après avoir exploré %d nœuds", nodes_explored)
         return None
 
     @staticmethod
     def dijkstra_pathfinding(graph, start_station: str, end_station: str,
-                             prefer_line_continuity: bool = True) -> Optional[Dict[str, Any]]:
+                             prefer_line_continuity: bool = True,
+                             _penalty_override: Optional[float] = None,
+                             _compiled: bool = True) -> Optional[Dict[str, Any]]:
         """
         Implémentation optimisée de l'algorithme de Dijkstra comme fallback pour A*.
         Version plus robuste et déterministe.
@@ -222,6 +442,8 @@ class PathFinder:
             start_station: Station de départ
             end_station: Station d'arrivée
             prefer_line_continuity: Si True, pénalise les changements de ligne
+            _penalty_override: Pénalité de changement de ligne à la place de 0.15 (chemins alternatifs)
+            _compiled: Si False, toujours utiliser la boucle Python (référence de _check_kernels)
 
         Returns:
             Dictionnaire contenant le chemin et le coût, ou None si aucun chemin
@@ -239,66 +461,82 @@ class PathFinder:
         if start_station == end_station:
             return {"path": [start_station], "distance": 0.0}
 
-        # Structures pour Dijkstra
-        distances = {node: float('infinity') for node in graph.nodes}
-        distances[start_station] = 0.0
+        # Structures pour Dijkstra, indexées par l'identifiant entier des stations (graph.search_index())
+        index = graph.search_index()
+        names, adj, adj_lines = index.names, index.adj, index.adj_lines
+        transfer_line = index.line_ids.get("transfer")
+        start_id = index.ids[start_station]
+        end_id = index.ids[end_station]
+
+        # Pénalité légèrement plus faible que A*, sauf pénalité imposée
+        penalty = 0.15 if _penalty_override is None else _penalty_override
+        if not prefer_line_continuity:
+            penalty = 0.0
 
-        # Prédécesseurs pour reconstruction du chemin
-        predecessors = {node: None for node in graph.nodes}
+        if _use_kernels and _compiled:
+            path, cost, nodes_explored = PathFinder._compiled_search(index, None, start_id, end_id, penalty)
+            if path is None:
+                logger.warning("Dijkstra n'a trouvé aucun chemin après avoir exploré %d nœuds", nodes_explored)
+                return None
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Dijkstra trouvé un chemin en explorant %d nœuds", nodes_explored)
+            return {"path": path, "distance": cost}
 
-        # Ligne utilisée pour arriver à chaque nœud
-        previous_lines = {node: None for node in graph.nodes}
+        distances = [INF] * len(names)
+        distances[start_id] = 0.0
 
-        # File de priorité: (distance, station, previous_line)
-        priority_queue = [(0.0, start_station, None)]
+        # Prédécesseurs pour reconstruction du chemin (-1: aucun)
+        predecessors = [-1] * len(names)
 
-        # Ensemble des stations visitées
-        visited = set()
+        # File de priorité: (distance, station, previous_line), ligne -1 au départ
+        priority_queue = [(0.0, start_id, -1)]
+
+        # Stations visitées
+        visited = bytearray(len(names))
 
         # Statistiques de performance
         nodes_explored = 0
 
         while priority_queue:
-            current_distance, current_station, current_line = heapq.heappop(priority_queue)
+            current_distance, current, current_line = heapq.heappop(priority_queue)
 
             # Si station déjà visitée, ignorer
-            if current_station in visited:
+            if visited[current]:
                 continue
 
             # Marquer comme visitée
-            visited.add(current_station)
+            visited[current] = 1
             nodes_explored += 1
 
             # Si destination atteinte
-            if current_station == end_station:
-                log_info(f"Dijkstra trouvé un chemin en explorant {nodes_explored} nœuds")
+            if current == end_id:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Dijkstra trouvé un chemin en explorant %d nœuds", nodes_explored)
 
                 # Reconstruction du chemin
                 path = []
-                current = end_station
-                while current is not None:
-                    path.append(current)
+                while current != -1:
+                    path.append(names[current])
                     current = predecessors[current]
                 path.reverse()
 
                 return {
                     "path": path,
-                    "distance": distances[end_station]
+                    "distance": distances[end_id]
                 }
 
             # Explorer les voisins
-            for neighbor in graph.get_neighbors(current_station):
-                if neighbor in visited:
+            for neighbor, neighbor_line in zip(adj[current], adj_lines[current]):
+                if visited[neighbor]:
                     continue
 
                 # Coût de l'arête
-                neighbor_line = graph.get_line_between_stations(current_station, neighbor)
                 edge_cost = 1.0  # Coût de base
 
                 # Pénalité pour changement de ligne
-                if (prefer_line_continuity and current_line is not None and
-                        neighbor_line != current_line and neighbor_line != "transfer"):
-                    edge_cost += 0.15  # Pénalité légèrement plus faible que A*
+                if (penalty and current_line != -1 and
+                        neighbor_line != current_line and neighbor_line != transfer_line):
+                    edge_cost += penalty
 
                 # Calcul de la nouvelle distance
                 new_distance = current_distance + edge_cost
@@ -306,12 +544,11 @@ class PathFinder:
                 # Si ce chemin est meilleur
                 if new_distance < distances[neighbor]:
                     distances[neighbor] = new_distance
-                    predecessors[neighbor] = current_station
-                    previous_lines[neighbor] = neighbor_line
+                    predecessors[neighbor] = current
                     heapq.heappush(priority_queue, (new_distance, neighbor, neighbor_line))
 
         # Aucun chemin trouvé
-        log_warning(f"Dijkstra n'a trouvé aucun chemin après avoir exploré {nodes_explored} nœuds")
+        logger.warning("Dijkstra n'a trouvé aucun chemin après avoir exploré %d nœuds", nodes_explored)
         return None
 
     @staticmethod
@@ -320,6 +557,7 @@ class PathFinder:
         """
         Méthode principale pour trouver le chemin optimal.
         Utilise A* en priorité avec fallback vers Dijkstra si A* échoue.
+        Les résultats sont mis en cache par (départ, arrivée, préférence) tant que le graphe ne change pas.
 
         Args:
             graph: Instance du graphe
@@ -330,31 +568,85 @@ class PathFinder:
         Returns:
             Dictionnaire contenant le chemin et le coût, ou None si aucun chemin
         """
+        index = graph.search_index()
+        if start_station not in index.ids or end_station not in index.ids:
+            # Rien à mettre en cache: la recherche signale les stations manquantes
+            return PathFinder._search_optimal_path(graph, start_station, end_station, prefer_line_continuity)
+
+        PathFinder._sync_path_cache(graph)
+        cached = PathFinder._cached_find(graph, index.ids[start_station], index.ids[end_station],
+                                         prefer_line_continuity)
+        if cached is None:
+            return None
+        path_ids, cost = cached
+        return {"path": [index.names[i] for i in path_ids], "distance": cost}
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _cached_find(graph, start_id: int, end_id: int, prefer: bool) -> Optional[Tuple[Tuple[int, ...], float]]:
+        """Recherche de find_optimal_path sur identifiants entiers, mémorisée: (chemin, coût) ou None"""
+        index = graph.search_index()
+        result = PathFinder._search_optimal_path(graph, index.names[start_id], index.names[end_id], prefer)
+        if result is None:
+            return None
+        return tuple(index.ids[station] for station in result["path"]), result["distance"]
+
+    @staticmethod
+    def _sync_path_cache(graph) -> None:
+        """
+        Vide les caches de chemins et des endpoints si la version du graphe a changé (graphe rechargé,
+        reconstruit ou arêtes modifiées). Ces caches sont indexés par l'objet graphe: les vider libère
+        aussi l'ancien graphe, et une version étant unique dans le processus, un graphe recréé à la
+        même adresse ne peut pas retrouver les entrées de l'ancien.
+        """
+        global _cached_version
+        if graph.version != _cached_version:
+            PathFinder.clear_path_cache()
+            _cached_version = graph.version
+
+    @staticmethod
+    def clear_path_cache() -> None:
+        """
+        Vide les caches de find_optimal_path, des chemins alternatifs, des heuristiques et des endpoints
+        """
+        PathFinder._cached_find.cache_clear()
+        PathFinder._cached_modified_costs.cache_clear()
+        PathFinder._node_heuristic.cache_clear()
+        _routes_payload_cached.cache_clear()
+        _cached_suggestions.cache_clear()
+        _resolve_station.cache_clear()
+
+    @staticmethod
+    def _search_optimal_path(graph, start_station: str, end_station: str,
+                             prefer_line_continuity: bool) -> Optional[Dict[str, Any]]:
+        """Recherche de find_optimal_path, sans cache"""
         start_time = time.time()
 
         # Tentative avec A*
         try:
-            log_info("Tentative de recherche avec A*...")
+            logger.debug("Tentative de recherche avec A*...")
             result = PathFinder.a_star_pathfinding(graph, start_station, end_station, prefer_line_continuity)
 
             if result is not None:
-                execution_time = time.time() - start_time
-                log_info(f"A* réussie en {execution_time:.3f}s - Chemin de {len(result['path'])} stations")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("A* réussie en %.3fs - Chemin de %d stations",
+                                time.time() - start_time, len(result['path']))
                 return result
             else:
-                log_warning("A* n'a pas trouvé de chemin, passage à Dijkstra...")
+                logger.warning("A* n'a pas trouvé de chemin, passage à Dijkstra...")
 
         except Exception as e:
             log_error(f"Erreur avec A*: {e}, passage à Dijkstra...")
 
         # Fallback vers Dijkstra
         try:
-            log_info("Recherche avec Dijkstra (fallback)...")
+            logger.debug("Recherche avec Dijkstra (fallback)...")
             result = PathFinder.dijkstra_pathfinding(graph, start_station, end_station, prefer_line_continuity)
 
             if result is not None:
-                execution_time = time.time() - start_time
-                log_info(f"Dijkstra réussie en {execution_time:.3f}s - Chemin de {len(result['path'])} stations")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Dijkstra réussie en %.3fs - Chemin de %d stations",
+                                time.time() - start_time, len(result['path']))
                 return result
             else:
                 log_error("Dijkstra n'a pas trouvé de chemin non plus")
@@ -381,6 +673,7 @@ class PathFinder:
             Liste des chemins trouvés, triés par coût croissant
         """
         paths = []
+        station_sets = {}  # Ensembles de stations des chemins, réutilisés entre comparaisons
 
         # 1. Chemin optimal standard
         optimal_path = PathFinder.find_optimal_path(graph, start_station, end_station, prefer_line_continuity=True)
@@ -391,7 +684,8 @@ class PathFinder:
         if len(paths) < max_paths:
             alternative_path = PathFinder.find_optimal_path(graph, start_station, end_station,
                                                             prefer_line_continuity=False)
-            if alternative_path and not PathFinder._paths_are_equivalent(optimal_path, alternative_path):
+            if alternative_path and not PathFinder._paths_are_equivalent(optimal_path, alternative_path,
+                                                                         station_sets=station_sets):
                 paths.append(alternative_path)
 
         # 3. Chemin avec pénalité réduite pour les changements de ligne
@@ -400,7 +694,8 @@ class PathFinder:
             # Cette approche est plus simple et efficace que l'algorithme de Yen
             relaxed_path = PathFinder._find_path_with_modified_costs(graph, start_station, end_station,
                                                                      penalty_factor=0.05)
-            if relaxed_path and not any(PathFinder._paths_are_equivalent(relaxed_path, p) for p in paths):
+            if relaxed_path and not any(PathFinder._paths_are_equivalent(relaxed_path, p, station_sets=station_sets)
+                                        for p in paths):
                 paths.append(relaxed_path)
 
         # Trier par coût et retourner
@@ -408,9 +703,11 @@ class PathFinder:
         return paths[:max_paths]
 
     @staticmethod
-    def _paths_are_equivalent(path1: Optional[Dict], path2: Optional[Dict], threshold: float = 0.1) -> bool:
+    def _paths_are_equivalent(path1: Optional[Dict], path2: Optional[Dict], threshold: float = 0.1,
+                              station_sets: Optional[Dict[int, frozenset]] = None) -> bool:
         """
         Vérifie si deux chemins sont équivalents (même coût et chemin similaire).
+        station_sets: cache optionnel id(chemin) -> ensemble de ses stations, partagé entre les comparaisons.
         """
         if not path1 or not path2:
             return False
@@ -426,74 +723,65 @@ class PathFinder:
             return False
 
         # Vérifier la similarité des stations (au moins 70% en commun)
-        set1 = set(path1["path"])
-        set2 = set(path2["path"])
-        common = len(set1.intersection(set2))
-        total = len(set1.union(set2))
+        # (les ensembles ne sont construits que si les tests rapides ci-dessus n'ont pas conclu)
+        set1 = PathFinder._station_set(path1, station_sets)
+        set2 = PathFinder._station_set(path2, station_sets)
+        common = len(set1 & set2)
+        total = len(set1) + len(set2) - common
 
         similarity = common / total if total > 0 else 0
         return similarity > 0.7
 
+    @staticmethod
+    def _station_set(path: Dict, station_sets: Optional[Dict[int, frozenset]]) -> frozenset:
+        """Ensemble des stations d'un chemin, mis en cache dans station_sets s'il est fourni"""
+        if station_sets is None:
+            return frozenset(path["path"])
+        stations = station_sets.get(id(path))
+        if stations is None:
+            stations = station_sets[id(path)] = frozenset(path["path"])
+        return stations
+
     @staticmethod
     def _find_path_with_modified_costs(graph, start_station: str, end_station: str,
                                        penalty_factor: float = 0.05) -> Optional[Dict[str, Any]]:
         """
         Trouve un chemin avec des coûts modifiés pour explorer des alternatives.
+        Comme find_optimal_path, mis en cache par (départ, arrivée, pénalité) tant que le graphe ne change pas.
         """
-        # Utilise Dijkstra avec une pénalité très réduite pour les changements de ligne
-        if start_station not in graph.nodes or end_station not in graph.nodes:
+        index = graph.search_index()
+        if start_station not in index.ids or end_station not in index.ids:
             return None
 
-        if start_station == end_station:
-            return {"path": [start_station], "distance": 0.0}
-
-        distances = {node: float('infinity') for node in graph.nodes}
-        distances[start_station] = 0.0
-        predecessors = {node: None for node in graph.nodes}
-        previous_lines = {node: None for node in graph.nodes}
-
-        priority_queue = [(0.0, start_station, None)]
-        visited = set()
-
-        while priority_queue:
-            current_distance, current_station, current_line = heapq.heappop(priority_queue)
-
-            if current_station in visited:
-                continue
-
-            visited.add(current_station)
-
-            if current_station == end_station:
-                path = []
-                current = end_station
-                while current is not None:
-                    path.append(current)
-                    current = predecessors[current]
-                path.reverse()
-
-                return {"path": path, "distance": distances[end_station]}
-
-            for neighbor in graph.get_neighbors(current_station):
-                if neighbor in visited:
-                    continue
-
-                neighbor_line = graph.get_line_between_stations(current_station, neighbor)
-                edge_cost = 1.0
-
-                # Pénalité très réduite pour changement de ligne
-                if (current_line is not None and neighbor_line != current_line and
-                        neighbor_line != "transfer"):
-                    edge_cost += penalty_factor
+        PathFinder._sync_path_cache(graph)
+        cached = PathFinder._cached_modified_costs(graph, index.ids[start_station], index.ids[end_station],
+                                                   penalty_factor)
+        if cached is None:
+            return None
+        path_ids, cost = cached
+        return {"path": [index.names[i] for i in path_ids], "distance": cost}
 
-                new_distance = current_distance + edge_cost
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _cached_modified_costs(graph, start_id: int, end_id: int,
+                               penalty_factor: float) -> Optional[Tuple[Tuple[int, ...], float]]:
+        """Recherche de _find_path_with_modified_costs sur identifiants entiers, mémorisée: (chemin, coût) ou None"""
+        index = graph.search_index()
+        result = PathFinder._search_with_modified_costs(graph, index.names[start_id], index.names[end_id],
+                                                        penalty_factor)
+        if result is None:
+            return None
+        return tuple(index.ids[station] for station in result["path"]), result["distance"]
 
-                if new_distance < distances[neighbor]:
-                    distances[neighbor] = new_distance
-                    predecessors[neighbor] = current_station
-                    previous_lines[neighbor] = neighbor_line
-                    heapq.heappush(priority_queue, (new_distance, neighbor, neighbor_line))
+    @staticmethod
+    def _search_with_modified_costs(graph, start_station: str, end_station: str,
+                                    penalty_factor: float) -> Optional[Dict[str, Any]]:
+        """Recherche de _find_path_with_modified_costs, sans cache"""
+        # Dijkstra avec une pénalité très réduite pour les changements de ligne
+        return PathFinder.dijkstra_pathfinding(graph, start_station, end_station, prefer_line_continuity=True,
+                                               _penalty_override=penalty_factor)
 
-        return None    @staticmethod
+    @staticmethod
     def create_detailed_route_info(graph, route_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crée des informations détaillées sur un trajet pour le calculateur d'horaires
@@ -520,7 +808,7 @@ class PathFinder:
             line = graph.get_line_between_stations(from_station, to_station)
             
             # Nettoyer le nom de la ligne
-            if line in ["?", "transfer", "Correspondance"]:
+            if line in UNKNOWN_LINES:
                 line = "Correspondance"
             
             # Créer le segment
@@ -609,85 +897,62 @@ class PathFinder:
                 from_station = path[i]
                 to_station = path[i + 1]
                 line = graph.get_line_between_stations(from_station, to_station)
-                
-                # LOG DEBUG: Ajouter des logs détaillés pour comprendre le problème
-                from_name = graph.get_station_name(from_station)
-                to_name = graph.get_station_name(to_station)
-                # log_debug(f"Connexion {i}: {from_name} -> {to_name} | ligne détectée: '{line}'")
-
-                path_with_lines.append({
-                    "from": from_station,
-                    "to": to_station,
-                    "line": line,
-                    "is_unknown": line in ["?", "transfer", "Correspondance"],
-                })
+                # log_debug(f"Connexion {i}: {from_station} -> {to_station} | ligne détectée: '{line}'")
+
+                path_with_lines.append(Step(from_station, to_station, line,
+                                            line in UNKNOWN_LINES))
 
             # LOG DEBUG: Afficher le path_with_lines complet
-            # log_debug(f"Path avec lignes détecté: {[(graph.get_station_name(step['from']), graph.get_station_name(step['to']), step['line'], step['is_unknown']) for step in path_with_lines]}")
+            # log_debug(f"Path avec lignes détecté: {[(graph.get_station_name(step.frm), graph.get_station_name(step.to), step.line, step.is_unknown) for step in path_with_lines]}")
+
+            # Ligne valide suivante de chaque connexion, en un balayage arrière
+            # (les connexions suivantes ne sont pas encore inférées quand on les consulte)
+            next_known_lines = [None] * len(path_with_lines)
+            next_known = None
+            for i in range(len(path_with_lines) - 1, -1, -1):
+                next_known_lines[i] = next_known
+                if not path_with_lines[i].is_unknown:
+                    next_known = path_with_lines[i].line
 
             # Étape 1: Inférer les lignes manquantes en regardant le contexte et corriger les erreurs
+            # (la ligne valide précédente, inférences comprises, est suivie au fil du parcours)
+            prev_known = None
             for i, step in enumerate(path_with_lines):
-                if step["is_unknown"]:
-                    from_name = graph.get_station_name(step["from"])
-                    to_name = graph.get_station_name(step["to"])
-                    # log_debug(f"Tentative d'inférence pour connexion inconnue: {from_name} -> {to_name}")
-                    
-                    # Chercher la ligne précédente valide
-                    prev_line = None
-                    for j in range(i - 1, -1, -1):
-                        if not path_with_lines[j]["is_unknown"]:
-                            prev_line = path_with_lines[j]["line"]
-                            break
-
-                    # Chercher la ligne suivante valide
-                    next_line = None
-                    for j in range(i + 1, len(path_with_lines)):
-                        if not path_with_lines[j]["is_unknown"]:
-                            next_line = path_with_lines[j]["line"]
-                            break
+                if step.is_unknown:
+                    # log_debug(f"Tentative d'inférence pour connexion inconnue: {step.frm} -> {step.to}")
+                    prev_line = prev_known
+                    next_line = next_known_lines[i]
 
                     # log_debug(f"  Ligne précédente: {prev_line}, Ligne suivante: {next_line}")
 
                     # Si les lignes précédente et suivante sont identiques, c'est probablement une continuité
                     if prev_line and next_line and prev_line == next_line:
                         # log_debug(f"  -> Inférence: connexion continue sur ligne {prev_line}")
-                        step["line"] = prev_line
-                        step["is_unknown"] = False
-                        step["inferred"] = True
+                        path_with_lines[i] = step._replace(line=prev_line, is_unknown=False, inferred=True)
                     else:
                         # Dernière tentative: vérifier si les deux stations sont directement connectées sur une même ligne
                         # en examinant tous les voisins directs
-                        from_neighbors = graph.get_neighbors(step["from"])
-                        if step["to"] in from_neighbors:
-                            # Il y a une connexion directe, récupérer toutes les lignes possibles
+                        from_neighbors = graph.get_neighbors(step.frm)
+                        if step.to in from_neighbors:
+                            # Il y a une connexion directe, récupérer la ligne de l'arête entre ces deux stations
                             all_lines = set()
-                            
-                            # Parcourir toutes les arêtes entre ces deux stations
-                            for neighbor in from_neighbors:
-                                if neighbor == step["to"]:
-                                    line = graph.get_line_between_stations(step["from"], step["to"])
-                                    if line not in ["?", "transfer", "Correspondance"]:
-                                        all_lines.add(line)
-                            
+                            line = graph.get_line_between_stations(step.frm, step.to)
+                            if line not in UNKNOWN_LINES:
+                                all_lines.add(line)
+
                             # Si une ligne spécifique est trouvée, l'utiliser
                             if len(all_lines) == 1:
                                 inferred_line = list(all_lines)[0]
                                 # log_debug(f"  -> Inférence par connexion directe: ligne {inferred_line}")
-                                step["line"] = inferred_line
-                                step["is_unknown"] = False
-                                step["inferred"] = True
+                                path_with_lines[i] = step._replace(line=inferred_line, is_unknown=False, inferred=True)
                             elif len(all_lines) > 1:
                                 # S'il y a plusieurs lignes possibles, choisir celle qui correspond au contexte
                                 if prev_line in all_lines:
                                     # log_debug(f"  -> Inférence par contexte précédent: ligne {prev_line}")
-                                    step["line"] = prev_line
-                                    step["is_unknown"] = False
-                                    step["inferred"] = True
+                                    path_with_lines[i] = step._replace(line=prev_line, is_unknown=False, inferred=True)
                                 elif next_line in all_lines:
                                     # log_debug(f"  -> Inférence par contexte suivant: ligne {next_line}")
-                                    step["line"] = next_line
-                                    step["is_unknown"] = False
-                                    step["inferred"] = True
+                                    path_with_lines[i] = step._replace(line=next_line, is_unknown=False, inferred=True)
                                 else:
                                     pass  # log_debug(f"  -> Plusieurs lignes possibles {all_lines}, garder comme transfert")
                             else:
@@ -695,94 +960,50 @@ class PathFinder:
                                 # et qu'il s'agit d'une connexion directe marquée comme transfer, 
                                 # alors c'est probablement une continuité de ligne mal étiquetée
                                 if (prev_line and next_line and prev_line == next_line and
-                                    prev_line not in ["?", "transfer", "Correspondance"]):
+                                    prev_line not in UNKNOWN_LINES):
                                     # log_debug(f"  -> Inférence par continuité de ligne: {prev_line} (transfert mal étiqueté)")
-                                    step["line"] = prev_line
-                                    step["is_unknown"] = False
-                                    step["inferred"] = True
+                                    path_with_lines[i] = step._replace(line=prev_line, is_unknown=False, inferred=True)
                                 else:
                                     pass  # log_debug(f"  -> Pas d'inférence possible, reste comme transfert")
                         else:
                             pass  # log_debug(f"  -> Pas de connexion directe, reste comme transfert")
 
+                if not path_with_lines[i].is_unknown:
+                    prev_known = path_with_lines[i].line
+
             # Étape 2: Grouper les segments par ligne continue de manière intelligente
             segments = []
             current_segment = None
 
-            def are_same_logical_line(line1, line2):
-                """Vérifie si deux identifiants de ligne correspondent à la même ligne logique"""
-                result = False
-                
-                if line1 == line2:
-                    result = True
-                elif line1 and line2:
-                    # Nettoyer les noms de ligne pour enlever les variations
-                    clean_line1 = line1.replace("bis", "B").replace("Bis", "B")
-                    clean_line2 = line2.replace("bis", "B").replace("Bis", "B")
-                    
-                    # Extraire le numéro principal (exemple: "3", "3B", "7", "7B")
-                    import re
-                    pattern = r'^(\d+[AB]?)'
-                    match1 = re.match(pattern, clean_line1)
-                    match2 = re.match(pattern, clean_line2)
-                    
-                    if match1 and match2:
-                        result = match1.group(1) == match2.group(1)
-                
-                # log_debug(f"Comparaison ligne: '{line1}' vs '{line2}' -> {result}")
-                return result
-
             for step in path_with_lines:
-                if step["is_unknown"]:
+                if step.is_unknown:
                     # Si c'est encore inconnu après inférence, c'est probablement un vrai transfert
                     # Mais seulement si c'est entre deux stations différentes
-                    if step["from"] != step["to"]:
-                        from_name = graph.get_station_name(step["from"])
-                        to_name = graph.get_station_name(step["to"])
-                        # log_debug(f"Ajout d'un transfert: {from_name} -> {to_name}")
-                        
+                    if step.frm != step.to:
+                        # log_debug(f"Ajout d'un transfert: {step.frm} -> {step.to}")
                         if current_segment is not None:
                             segments.append(current_segment)
                             current_segment = None
 
                         # Ajouter le transfert comme segment séparé
-                        segments.append({
-                            "line": "Correspondance à pied",
-                            "from": step["from"],
-                            "to": step["to"],
-                            "stops": 1,
-                            "is_transfer": True
-                        })
-                    else:
-                        from_name = graph.get_station_name(step["from"])
-                        # log_debug(f"Ignorer transfert fictif sur la même station: {from_name}")
+                        segments.append(Segment("Correspondance à pied", step.frm, step.to, is_transfer=True))
                     # Si from == to, ignorer ce "transfert" fictif
                 else:
                     # C'est une connexion de ligne valide
-                    from_name = graph.get_station_name(step["from"])
-                    to_name = graph.get_station_name(step["to"])
-                    
                     # Utiliser la logique améliorée pour détecter la même ligne logique
-                    if current_segment is None or not are_same_logical_line(current_segment["line"], step["line"]):
+                    if current_segment is None or not _same_logical_line(current_segment.line, step.line):
                         # Commencer un nouveau segment
-                        # log_debug(f"Nouveau segment: {from_name} -> {to_name} (ligne: {step['line']})")
+                        # log_debug(f"Nouveau segment: {step.frm} -> {step.to} (ligne: {step.line})")
                         if current_segment is not None:
                             segments.append(current_segment)
 
-                        current_segment = {
-                            "line": step["line"],
-                            "from": step["from"],
-                            "to": step["to"],
-                            "stops": 1,
-                            "is_transfer": False,
-                            "stations": [step["from"], step["to"]]
-                        }
+                        current_segment = Segment(step.line, step.frm, step.to, stations=[step.frm, step.to])
                     else:
                         # Continuer le segment existant (même ligne logique)
-                        # log_debug(f"Continuer segment existant: {from_name} -> {to_name} (ligne: {step['line']})")
-                        current_segment["to"] = step["to"]
-                        current_segment["stops"] += 1
-                        current_segment["stations"].append(step["to"])
+                        # log_debug(f"Continuer segment existant: {step.frm} -> {step.to} (ligne: {step.line})")
+                        current_segment.to = step.to
+                        current_segment.stops += 1
+                        current_segment.stations.append(step.to)
 
             # Finaliser le dernier segment
             if current_segment is not None:
@@ -790,31 +1011,25 @@ class PathFinder:
 
             # Si aucun segment, créer un segment basique
             if not segments:
-                segments.append({
-                    "line": "Métro",
-                    "from": path[0],
-                    "to": path[-1],
-                    "stops": len(path) - 1,
-                    "is_transfer": False
-                })
+                segments.append(Segment("Métro", path[0], path[-1], stops=len(path) - 1))
 
             # Convertir pour le frontend
             for segment in segments:
                 route_segment = {
-                    "line": segment["line"],
-                    "from": graph.get_station_name(segment["from"]),
-                    "to": graph.get_station_name(segment["to"]),
-                    "stops": segment["stops"]
+                    "line": segment.line,
+                    "from": graph.get_station_name(segment.frm),
+                    "to": graph.get_station_name(segment.to),
+                    "stops": segment.stops
                 }
 
-                if segment.get("is_transfer", False):
+                if segment.is_transfer:
                     route_segment["type"] = "transfer"
 
                 route_info["segments"].append(route_segment)
 
             # Compter les vraies correspondances (changements de ligne réels + transferts)
-            real_line_segments = [s for s in segments if not s.get("is_transfer", False)]
-            transfer_segments = [s for s in segments if s.get("is_transfer", False)]
+            real_line_segments = [s for s in segments if not s.is_transfer]
+            transfer_segments = [s for s in segments if s.is_transfer]
 
             # Correspondances = changements de ligne + transferts
             correspondances = max(0, len(real_line_segments) - 1) + len(transfer_segments)
@@ -828,44 +1043,30 @@ class PathFinder:
         """
         Élimine les trajets identiques et incohérents en comparant les segments.
         Retourne une liste de trajets uniques et logiques.
-        CORRECTION: Ajout de logs pour diagnostiquer les filtrages.
         """
         unique_routes = []
         seen_routes = set()
+        add_seen = seen_routes.add
         filtered_count = 0
 
-        log_debug(f"Début déduplication: {len(routes)} routes à analyser")
-
-        for i, route in enumerate(routes):
+        for route in routes:
             # Vérifier d'abord si le trajet est logique
             if not PathFinder._is_route_logical(route):
                 filtered_count += 1
-                log_debug(f"Route {i + 1} filtrée car illogique: {route.get('segments', [])}")
                 continue
 
-            # Créer une signature unique pour ce trajet basée sur les segments
-            segments_signature = []
-            for segment in route["segments"]:
-                seg_key = (
-                    segment["line"],
-                    segment["from"],
-                    segment["to"],
-                    segment.get("type", "normal")
-                )
-                segments_signature.append(seg_key)
-
-            # Convertir en tuple pour pouvoir l'utiliser comme clé de set
-            route_signature = tuple(segments_signature)
+            # Créer une signature unique pour le trajet basée sur les segments (l'ordre compte)
+            route_signature = tuple((segment["line"], segment["from"], segment["to"], segment.get("type", "normal"))
+                                    for segment in route["segments"])
 
             # Si on n'a pas encore vu ce trajet, l'ajouter
             if route_signature not in seen_routes:
-                seen_routes.add(route_signature)
+                add_seen(route_signature)
                 unique_routes.append(route)
-                log_debug(f"Route {i + 1} gardée: {len(route['segments'])} segments")
-            else:
-                log_debug(f"Route {i + 1} dupliquée, ignorée")
 
-        log_info(f"Déduplication terminée: {len(unique_routes)} routes uniques gardées, {filtered_count} filtrées")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Déduplication terminée: %d routes uniques gardées, %d filtrées",
+                        len(unique_routes), filtered_count)
 
         # SÉCURITÉ: Si toutes les routes ont été filtrées mais qu'on en avait au départ
         if len(unique_routes) == 0 and len(routes) > 0:
@@ -889,26 +1090,25 @@ class PathFinder:
 
         # Seuls les cas vraiment problématiques sont filtrés :
 
-        # 1. Vérifier qu'il n'y a pas plus de 3 segments identiques consécutifs (cas extrême)
+        # 1. Vérifier qu'il n'y a pas de boucles infinies (plus de 20 segments = suspect)
+        # (test en O(1), fait avant le parcours des segments)
+        if len(segments) > 20:
+            log_warning(f"Trajet avec {len(segments)} segments, possiblement une boucle")
+            return False
+
+        # 2. Vérifier qu'il n'y a pas plus de 3 segments identiques consécutifs (cas extrême)
+        # (la clé de chaque segment n'est construite qu'une fois, puis comparée à la précédente)
+        previous = None
         consecutive_identical = 0
-        for i in range(len(segments) - 1):
-            current = segments[i]
-            next_seg = segments[i + 1]
-
-            if (current["line"] == next_seg["line"] and
-                    current["from"] == next_seg["from"] and
-                    current["to"] == next_seg["to"] and
-                    current.get("type", "normal") == next_seg.get("type", "normal")):
+        for segment in segments:
+            current = (segment["line"], segment["from"], segment["to"], segment.get("type", "normal"))
+            if current == previous:
                 consecutive_identical += 1
                 if consecutive_identical >= 2:  # Plus de 2 segments identiques consécutifs
                     return False
             else:
                 consecutive_identical = 0
-
-        # 2. Vérifier qu'il n'y a pas de boucles infinies (plus de 20 segments = suspect)
-        if len(segments) > 20:
-            log_warning(f"Trajet avec {len(segments)} segments, possiblement une boucle")
-            return False
+            previous = current
 
         # SUPPRESSION DES FILTRES TROP STRICTS :
         # - Les transferts au début/fin peuvent être légitimes (stations avec plusieurs quais)
@@ -917,7 +1117,101 @@ class PathFinder:
 
         return True
 
-        return processed_routes
+
+def _name_similarity(a: str, b: str) -> float:
+    """Similarité de deux noms entre 0 et 1 (rapidfuzz en C++ si disponible, sinon difflib)"""
+    if fuzz_ratio is not None:
+        return fuzz_ratio(a, b) / 100.0
+    from difflib import SequenceMatcher  # seul usage du module, chargé à la demande
+    return SequenceMatcher(None, a, b).ratio()
+
+
+@lru_cache(maxsize=1024)
+def _cached_suggestions(graph, query_clean: str) -> Tuple[str, ...]:
+    """Suggestions pour une station introuvable, mémorisées: les mêmes fautes de frappe reviennent souvent"""
+    return tuple(suggest_station_alternatives(graph.stations, query_clean, max_suggestions=3))
+
+
+def _station_error_message(graph, original_name: str, query_clean: str, fallback: str) -> str:
+    """Message d'erreur avec suggestions de stations, ou fallback si elles ne peuvent pas être calculées"""
+    try:
+        return create_user_friendly_error_message(original_name, _cached_suggestions(graph, query_clean))
+    except Exception:
+        return fallback
+
+
+def _validate_station_match(original_name: str, station_id: str, graph) -> bool:
+    """Valide qu'une correspondance de station est correcte (commun à /routes et /routes-with-schedule)"""
+    if not station_id:
+        return False
+
+    # Cas courant: nom exact, ou station sans "porte de" (seul cas vérifié), sans normaliser la requête
+    if original_name == graph.get_station_name(station_id):
+        return True
+    station_normalized = graph.get_normalized_name(station_id)
+    if "porte de" not in station_normalized:
+        return True
+    original_normalized = normalize_text(original_name).lower()
+
+    # Vérification stricte pour les stations avec "porte de"
+    if "porte de" in original_normalized:
+        original_after = original_normalized.replace("porte de ", "").strip()
+        station_after = station_normalized.replace("porte de ", "").strip()
+
+        # Si les suffixes sont très différents, rejeter
+        if original_after != station_after and len(original_after) > 2:
+            similarity = _name_similarity(original_after, station_after)
+            if similarity < 0.7:  # Seuil strict pour éviter charenton->champerret
+                log_warning(
+                    f"Correspondance rejetée: '{original_name}' -> '{graph.get_station_name(station_id)}' (similarité suffixe: {similarity:.2f})")
+                return False
+
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _resolve_station(graph, user_input: str, role: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Station correspondant à la saisie de l'utilisateur (commun à /routes et /routes-with-schedule),
+    mémorisée: (stop_id, None), ou (None, message d'erreur avec suggestions).
+    role ("de départ", "d'arrivée") ne sert qu'aux logs.
+    """
+    query_clean = normalize_text(user_input).strip().lower()
+    matches = graph.find_station_by_name(query_clean)
+
+    if not matches:
+        error_message = _station_error_message(graph, user_input, query_clean,
+                                               f"Aucune station trouvée pour '{user_input}'")
+        log_warning(f"Station {role} non trouvée: {user_input} -> {error_message}")
+        return None, error_message
+
+    # Prendre la première correspondance valide
+    for match in matches:
+        if _validate_station_match(user_input, match, graph):
+            return match, None
+
+    log_warning(f"Correspondance {role} rejetée pour '{user_input}'")
+    return None, _station_error_message(graph, user_input, query_clean,
+                                        f"Aucune station valide trouvée pour '{user_input}'")
+
+
+def _unique_graph():
+    """
+    Graphe partagé de backend.main (get_unique_graph).
+    L'import reste local: backend.main importe router depuis ce module au chargement, un import
+    en tête échouerait dès que ce module est importé en premier (import circulaire).
+    Après le premier appel, ce n'est plus qu'une lecture dans sys.modules.
+    """
+    from backend.main import get_unique_graph
+    return get_unique_graph()
+
+
+@router.on_event("startup")
+async def warm_path_finder():
+    """Charge le graphe et prépare PathFinder au démarrage, plutôt que pendant la première requête"""
+    graph = await run_in_threadpool(_unique_graph)
+    if graph is not None:
+        await run_in_threadpool(PathFinder.prepare, graph)
 
 
 @router.get("/routes", response_model=Dict[str, Any])
@@ -925,101 +1219,52 @@ async def find_routes(depart: str, arrivee: str):
     """
     Endpoint pour trouver les trajets entre deux stations
     """
-    from backend.main import get_unique_graph
-    from backend.utils.fuzzy_search import suggest_station_alternatives, create_user_friendly_error_message
-
     start_time = time.time()
     log_info(f"Recherche de trajets entre '{depart}' et '{arrivee}'")
 
     # Récupérer l'instance du graphe
     try:
-        graph = get_unique_graph()
+        graph = _unique_graph()
         if not graph:
             raise HTTPException(status_code=500, detail="Le graphe n'est pas initialisé")
     except Exception as e:
         log_error(f"Erreur lors de la récupération du graphe: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
-    # Nettoyer les noms de stations pour la recherche
-    depart_clean = normalize_text(depart).strip().lower()
-    arrivee_clean = normalize_text(arrivee).strip().lower()
+    # Le graphe ne change pas entre deux rechargements: une même requête donne la même réponse
+    PathFinder._sync_path_cache(graph)
+    payload, route_count = _routes_payload_cached(graph, depart, arrivee)
 
-    # Trouver les stations correspondantes (recherche approximative améliorée)
-    depart_matches = graph.find_station_by_name(depart_clean)
-    arrivee_matches = graph.find_station_by_name(arrivee_clean)
+    if route_count is not None:
+        execution_time = time.time() - start_time
+        log_info(f"{route_count} trajet(s) unique(s) trouvé(s) en {execution_time:.2f} secondes")
 
-    # Vérification supplémentaire pour éviter les confusions
-    def validate_station_match(original_name: str, station_id: str, graph) -> bool:
-        """Valide qu'une correspondance de station est correcte"""
-        if not station_id:
-            return False
+    # Réponse déjà sérialisée: FastAPI ne la repasse pas dans jsonable_encoder pour response_model
+    return Response(payload, media_type="application/json")
 
-        station_name = graph.get_station_name(station_id)
-        original_normalized = normalize_text(original_name).lower()
-        station_normalized = normalize_text(station_name).lower()
-
-        # Vérification stricte pour les stations avec "porte de"
-        if "porte de" in original_normalized and "porte de" in station_normalized:
-            original_after = original_normalized.replace("porte de ", "").strip()
-            station_after = station_normalized.replace("porte de ", "").strip()
-
-            # Si les suffixes sont très différents, rejeter
-            if original_after != station_after and len(original_after) > 2:
-                similarity = SequenceMatcher(None, original_after, station_after).ratio()
-                if similarity < 0.7:  # Seuil strict pour éviter charenton->champerret
-                    log_warning(
-                        f"Correspondance rejetée: '{original_name}' -> '{station_name}' (similarité suffixe: {similarity:.2f})")
-                    return False
-
-        return True
-
-    # Gestion des erreurs avec suggestions améliorées
-    if not depart_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, depart_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(depart, suggestions)
-        except:
-            error_message = f"Aucune station trouvée pour '{depart}'"
-
-        log_warning(f"Station de départ non trouvée: {depart} -> {error_message}")
-        return {"error": error_message}
 
-    # Validation de la correspondance de départ
-    valid_depart_matches = [match for match in depart_matches if validate_station_match(depart, match, graph)]
-    if not valid_depart_matches:
-        log_warning(f"Correspondance de départ rejetée pour '{depart}'")
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, depart_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(depart, suggestions)
-        except:
-            error_message = f"Aucune station valide trouvée pour '{depart}'"
-        return {"error": error_message}
+@lru_cache(maxsize=2048)
+def _routes_payload_cached(graph, depart: str, arrivee: str) -> Tuple[bytes, Optional[int]]:
+    """
+    Réponse de find_routes pour (depart, arrivee), sérialisée et mémorisée, avec son nombre de
+    trajets (None pour une erreur). Les textes bruts forment la clé, car ils apparaissent dans la
+    validation et les messages d'erreur. Vidée avec les caches de PathFinder (clear_path_cache).
+    """
+    response = _compute_routes(graph, depart, arrivee)
+    return dumps(response), (len(response["routes"]) if "routes" in response else None)
 
-    if not arrivee_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, arrivee_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(arrivee, suggestions)
-        except:
-            error_message = f"Aucune station trouvée pour '{arrivee}'"
 
-        log_warning(f"Station d'arrivée non trouvée: {arrivee} -> {error_message}")
+def _compute_routes(graph, depart: str, arrivee: str) -> Dict[str, Any]:
+    """Correspondance des stations, recherche des chemins et mise en forme des trajets pour find_routes"""
+    # Trouver et valider les stations correspondantes (recherche approximative, suggestions en cas d'erreur)
+    start_station_id, error_message = _resolve_station(graph, depart, "de départ")
+    if error_message is not None:
         return {"error": error_message}
 
-    # Validation de la correspondance d'arrivée
-    valid_arrivee_matches = [match for match in arrivee_matches if validate_station_match(arrivee, match, graph)]
-    if not valid_arrivee_matches:
-        log_warning(f"Correspondance d'arrivée rejetée pour '{arrivee}'")
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, arrivee_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(arrivee, suggestions)
-        except:
-            error_message = f"Aucune station valide trouvée pour '{arrivee}'"
+    end_station_id, error_message = _resolve_station(graph, arrivee, "d'arrivée")
+    if error_message is not None:
         return {"error": error_message}
 
-    # Prendre la première correspondance valide
-    start_station_id = valid_depart_matches[0]
-    end_station_id = valid_arrivee_matches[0]
-
     start_station_name = graph.get_station_name(start_station_id)
     end_station_name = graph.get_station_name(end_station_id)
 
@@ -1051,10 +1296,7 @@ async def find_routes(depart: str, arrivee: str):
         final_routes = unique_routes  # Un seul trajet unique
     else:
         # Garder entre 2 et 5 trajets uniques, en priorisant les plus courts
-        final_routes = sorted(unique_routes, key=lambda r: r["duration"])[:min(5, len(unique_routes))]
-
-    execution_time = time.time() - start_time
-    log_info(f"{len(final_routes)} trajet(s) unique(s) trouvé(s) en {execution_time:.2f} secondes")
+        final_routes = heapq.nsmallest(5, unique_routes, key=lambda r: r["duration"])
 
     return {
         "from": start_station_name,
@@ -1074,9 +1316,6 @@ async def find_routes_with_schedule(
     """
     Endpoint pour trouver les trajets entre deux stations avec prise en compte des horaires
     """
-    from backend.main import get_unique_graph
-    from backend.utils.fuzzy_search import suggest_station_alternatives, create_user_friendly_error_message
-
     start_time = time.time()
     log_info(f"Recherche de trajets avec horaires entre '{depart}' et '{arrivee}'")
 
@@ -1085,7 +1324,7 @@ async def find_routes_with_schedule(
 
     # Récupérer l'instance du graphe
     try:
-        graph = get_unique_graph()
+        graph = _unique_graph()
         if not graph:
             raise HTTPException(status_code=500, detail="Le graphe n'est pas initialisé")
     except Exception as e:
@@ -1114,75 +1353,18 @@ async def find_routes_with_schedule(
     except ValueError as e:
         return {"error": f"Format de date/heure invalide: {str(e)}"}
 
-    # Nettoyer les noms de stations pour la recherche
-    depart_clean = normalize_text(depart).strip().lower()
-    arrivee_clean = normalize_text(arrivee).strip().lower()
-
-    # Trouver les stations correspondantes (utilise la même logique que l'endpoint existant)
-    depart_matches = graph.find_station_by_name(depart_clean)
-    arrivee_matches = graph.find_station_by_name(arrivee_clean)
-
-    # Validation des correspondances (même logique que l'endpoint existant)
-    def validate_station_match(original_name: str, station_id: str, graph) -> bool:
-        if not station_id:
-            return False
-
-        station_name = graph.get_station_name(station_id)
-        original_normalized = normalize_text(original_name).lower()
-        station_normalized = normalize_text(station_name).lower()
-
-        if "porte de" in original_normalized and "porte de" in station_normalized:
-            original_after = original_normalized.replace("porte de ", "").strip()
-            station_after = station_normalized.replace("porte de ", "").strip()
-
-            if original_after != station_after and len(original_after) > 2:
-                similarity = SequenceMatcher(None, original_after, station_after).ratio()
-                if similarity < 0.7:
-                    log_warning(
-                        f"Correspondance rejetée: '{original_name}' -> '{station_name}' (similarité suffixe: {similarity:.2f})")
-                    return False
-
-        return True
+    # Caches des stations et des chemins valides pour cette version du graphe uniquement
+    PathFinder._sync_path_cache(graph)
 
-    # Gestion des erreurs pour les stations
-    if not depart_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, depart_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(depart, suggestions)
-        except:
-            error_message = f"Aucune station trouvée pour '{depart}'"
+    # Trouver et valider les stations correspondantes (recherche approximative, suggestions en cas d'erreur)
+    start_station_id, error_message = _resolve_station(graph, depart, "de départ")
+    if error_message is not None:
         return {"error": error_message}
 
-    valid_depart_matches = [match for match in depart_matches if validate_station_match(depart, match, graph)]
-    if not valid_depart_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, depart_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(depart, suggestions)
-        except:
-            error_message = f"Aucune station valide trouvée pour '{depart}'"
-        return {"error": error_message}
-
-    if not arrivee_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, arrivee_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(arrivee, suggestions)
-        except:
-            error_message = f"Aucune station trouvée pour '{arrivee}'"
+    end_station_id, error_message = _resolve_station(graph, arrivee, "d'arrivée")
+    if error_message is not None:
         return {"error": error_message}
 
-    valid_arrivee_matches = [match for match in arrivee_matches if validate_station_match(arrivee, match, graph)]
-    if not valid_arrivee_matches:
-        try:
-            suggestions = suggest_station_alternatives(graph.stations, arrivee_clean, max_suggestions=3)
-            error_message = create_user_friendly_error_message(arrivee, suggestions)
-        except:
-            error_message = f"Aucune station valide trouvée pour '{arrivee}'"
-        return {"error": error_message}
-
-    # Prendre la première correspondance valide
-    start_station_id = valid_depart_matches[0]
-    end_station_id = valid_arrivee_matches[0]
-
     start_station_name = graph.get_station_name(start_station_id)
     end_station_name = graph.get_station_name(end_station_id)
 
@@ -1246,6 +1428,13 @@ async def find_routes_with_schedule(
     def convert_corrected_segments_to_detailed_path(corrected_segments, original_path):
         """Convertit les segments corrigés en format détaillé pour le calculateur d'horaires"""
         detailed_path = []
+
+        # Noms des stations du trajet original, résolus une seule fois pour tous les segments
+        path_stations = [graph.get_station_name(station_id) for station_id in original_path]
+        # Position de chaque nom dans le trajet (première occurrence, comme list.index)
+        station_positions = {}
+        for position, name in enumerate(path_stations):
+            station_positions.setdefault(name, position)
         
         for segment in corrected_segments:
             # Traiter les correspondances à pied (vraies correspondances)
@@ -1273,9 +1462,8 @@ async def find_routes_with_schedule(
             
             # Trouver les indices dans le path original
             try:
-                path_stations = [graph.get_station_name(station_id) for station_id in original_path]
-                from_idx = path_stations.index(from_station)
-                to_idx = path_stations.index(to_station)
+                from_idx = station_positions[from_station]
+                to_idx = station_positions[to_station]
                 
                 # Créer des segments individuels pour chaque tronçon
                 for i in range(from_idx, to_idx):
@@ -1283,8 +1471,8 @@ async def find_routes_with_schedule(
                     to_station_id = original_path[i + 1]
                     
                     detailed_path.append({
-                        "from_station": graph.get_station_name(from_station_id),
-                        "to_station": graph.get_station_name(to_station_id),
+                        "from_station": path_stations[i],
+                        "to_station": path_stations[i + 1],
                         "from_station_id": from_station_id,
                         "to_station_id": to_station_id,
                         "travel_time": 2,  # Temps de base entre 2 stations
@@ -1292,7 +1480,7 @@ async def find_routes_with_schedule(
                             "short_name": segment["line"]
                         }
                     })
-            except (ValueError, IndexError) as e:
+            except (KeyError, IndexError) as e:
                 # Si on ne peut pas trouver les stations, créer un segment simple
                 log_warning(f"Impossible de détailler le segment {from_station} → {to_station}: {e}")
                 detailed_path.append({
@@ -1351,7 +1539,8 @@ async def find_routes_with_schedule(
                 })
                 scheduled_routes.append(scheduled_route)
             else:
-                log_debug(f"Impossible de calculer les horaires pour le créneau {slot_time.strftime('%H:%M')}: {scheduled_route['error']}")
+                logger.debug("Impossible de calculer les horaires pour le créneau %s: %s",
+                             slot_time.strftime('%H:%M'), scheduled_route['error'])
     
     if not scheduled_routes:
         # Si aucun trajet n'a pu être calculé avec les horaires, 
@@ -6,12 +6,28 @@ suggestions d'alternatives et création de messages d'erreur conviviaux.
 
 import re
 import unicodedata
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 from difflib import SequenceMatcher
 import logging
 
+# rapidfuzz est optionnel: il sert seulement à écarter d'avance les stations trop éloignées
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 logger = logging.getLogger(__name__)
 
+# Lettres accentuées du français -> lettre de base (même résultat que NFD sans les marques)
+_FRENCH_ACCENTS = "àâäéèêëîïôöùûüÿçÀÂÄÉÈÊËÎÏÔÖÙÛÜŸÇ"
+_FRENCH_ACCENTS_TABLE = str.maketrans({
+    accent: "".join(c for c in unicodedata.normalize('NFD', accent) if unicodedata.category(c) != 'Mn')
+    for accent in _FRENCH_ACCENTS
+})
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+
 
 def normalize_text(text: str) -> str:
     """
@@ -26,22 +42,31 @@ def normalize_text(text: str) -> str:
     if not text:
         return ""
     
-    # Supprimer les accents
-    text = unicodedata.normalize('NFD', text)
-    text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
+    # Supprimer les accents: les accents français en une passe (str.translate),
+    # puis la décomposition Unicode seulement s'il reste des caractères non ASCII
+    text = text.translate(_FRENCH_ACCENTS_TABLE)
+    if not text.isascii():
+        text = unicodedata.normalize('NFD', text)
+        text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
     
     # Convertir en minuscules
     text = text.lower()
     
     # Remplacer les caractères spéciaux par des espaces
-    text = re.sub(r'[^\w\s]', ' ', text)
+    text = _SPECIAL_CHARS_RE.sub(' ', text)
     
     # Normaliser les espaces multiples
-    text = re.sub(r'\s+', ' ', text)
+    text = _SPACES_RE.sub(' ', text)
     
     return text.strip()
 
 
+@lru_cache(maxsize=4096)
+def _normalized_station_name(station_name: str) -> str:
+    """normalize_text mémorisé pour les noms de stations, comparés à chaque recherche"""
+    return normalize_text(station_name)
+
+
 def calculate_similarity_score(query: str, station_name: str) -> float:
     """
     Calcule un score de similarité entre une requête et un nom de station.
@@ -63,8 +88,14 @@ def calculate_similarity_score(query: str, station_name: str) -> float:
         return 1.0
     
     # Score de base avec SequenceMatcher
-    base_score = SequenceMatcher(None, query, station_name).ratio()
-    
+    return _adjust_similarity_score(query, station_name, SequenceMatcher(None, query, station_name).ratio())
+
+
+def _adjust_similarity_score(query: str, station_name: str, base_score: float) -> float:
+    """
+    Bonus et pénalités de calculate_similarity_score appliqués au score de base.
+    Le résultat croît avec base_score: un majorant du score de base donne un majorant du score.
+    """
     # GROS BONUS pour correspondance exacte (insensible à la casse)
     if query.lower() == station_name.lower():
         return 0.99  # Quasi-parfait pour éviter les égalités
@@ -143,7 +174,7 @@ def find_best_station_matches(stations: Dict[str, Dict], name_query: str,
             continue
         
         # Normaliser le nom de la station
-        normalized_station_name = normalize_text(station_name)
+        normalized_station_name = _normalized_station_name(station_name)
         
         # Vérifier correspondance exacte (priorité absolue)
         if normalized_query == normalized_station_name:
@@ -157,14 +188,21 @@ def find_best_station_matches(stations: Dict[str, Dict], name_query: str,
         return exact_matches[:max_results]
     
     # Sinon, recherche floue avec seuil plus strict
-    for station_id, station_data in stations.items():
-        station_name = station_data.get('name', '')
-        if not station_name:
+    candidates = [(station_id, _normalized_station_name(station_data['name']))
+                  for station_id, station_data in stations.items() if station_data.get('name', '')]
+
+    # Le ratio de rapidfuzz (2 * plus longue sous-séquence commune / longueur totale) majore celui
+    # de SequenceMatcher: les stations dont le score majoré reste sous le seuil sont écartées
+    # sans calculer le ratio exact, en un seul appel C pour toutes les stations
+    upper_bounds = None
+    if process is not None and candidates:
+        upper_bounds = process.cdist([normalized_query], [name for _, name in candidates], scorer=fuzz.ratio)[0]
+
+    for i, (station_id, normalized_station_name) in enumerate(candidates):
+        if upper_bounds is not None and _adjust_similarity_score(
+                normalized_query, normalized_station_name, upper_bounds[i] / 100.0 + 1e-9) < min_score:
             continue
-        
-        # Normaliser le nom de la station
-        normalized_station_name = normalize_text(station_name)
-        
+
         # Calculer le score de similarité
         score = calculate_similarity_score(normalized_query, normalized_station_name)
         
@@ -11,11 +11,33 @@ import unicodedata
 # Initialiser colorama pour qu'il fonctionne correctement sur tous les OS
 init(autoreset=True)
 
+# Table de correspondance pour les caractères problématiques ou spéciaux restants
+# (minuscules et majuscules), appliquée en une passe par str.translate
+_REPLACEMENTS = {
+    'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
+    'à': 'a', 'â': 'a', 'ä': 'a',
+    'î': 'i', 'ï': 'i',
+    'ô': 'o', 'ö': 'o',
+    'ù': 'u', 'û': 'u', 'ü': 'u',
+    'ç': 'c',
+    'œ': 'oe',
+    'æ': 'ae',
+    'ñ': 'n',
+    '�': '_',  # Caractère de remplacement Unicode pour les caractères non reconnus
+    'ø': 'o',
+}
+_REPLACEMENTS_TABLE = str.maketrans({**_REPLACEMENTS,
+                                     **{accent.upper(): sans_accent.upper() for accent, sans_accent in _REPLACEMENTS.items()}})
+
 def normalize_text(text):
     """Remplace les caractères accentués et spéciaux par leurs équivalents sans accent.
     Traite également les problèmes d'encodage courants."""
     if not isinstance(text, str):
         text = str(text)
+
+    # Cas le plus courant: texte ASCII imprimable, déjà normalisé
+    if text.isascii() and text.isprintable():
+        return text
         
     # Tentative de normalisation Unicode (suppression des accents)
     try:
@@ -24,24 +46,7 @@ def normalize_text(text):
     except:
         pass
         
-    # Table de correspondance pour les caractères problématiques ou spéciaux restants
-    replacements = {
-        'é': 'e', 'è': 'e', 'ê': 'e', 'ë': 'e',
-        'à': 'a', 'â': 'a', 'ä': 'a',
-        'î': 'i', 'ï': 'i',
-        'ô': 'o', 'ö': 'o',
-        'ù': 'u', 'û': 'u', 'ü': 'u',
-        'ç': 'c',
-        'œ': 'oe',
-        'æ': 'ae',
-        'ñ': 'n',
-        '�': '_',  # Caractère de remplacement Unicode pour les caractères non reconnus
-        'ø': 'o',
-    }
-    
-    for accent, sans_accent in replacements.items():
-        text = text.replace(accent, sans_accent)
-        text = text.replace(accent.upper(), sans_accent.upper())
+    text = text.translate(_REPLACEMENTS_TABLE)
     
     # Suppression des caractères non imprimables
     text = ''.join(c for c in text if c.isprintable() or c in ['\n', '\t', '\r'])
@@ -0,0 +1,223 @@
+"""
+Boucle de recherche de plus court chemin compilée avec Numba.
+Le graphe est passé en CSR (indptr, voisins, lignes) sur les identifiants entiers de
+UniqueEdgesMetroGraph.search_index(). La même fonction sert à A* (heuristique h) et à
+Dijkstra (h nul): les coûts et les départages sont ceux des boucles Python de PathFinder.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+# Numba est optionnel: sans lui, PathFinder garde ses boucles Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+KERNEL_AVAILABLE = njit is not None
+
+
+def to_csr(adj: List[List[int]], adj_lines: List[List[int]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Listes d'adjacence -> (indptr, voisins, lignes) en int32, dans le même ordre"""
+    indptr = np.zeros(len(adj) + 1, dtype=np.int32)
+    indptr[1:] = np.cumsum([len(neighbors) for neighbors in adj])
+    neighbors = np.fromiter((n for row in adj for n in row), dtype=np.int32, count=int(indptr[-1]))
+    lines = np.fromiter((l for row in adj_lines for l in row), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, neighbors, lines
+
+
+if KERNEL_AVAILABLE:
+    @njit(cache=True)
+    def _less(hf, hg, hn, hl, i, j):
+        # Ordre lexicographique (f, g, station, ligne), comme les tuples de heapq
+        if hf[i] != hf[j]:
+            return hf[i] < hf[j]
+        if hg[i] != hg[j]:
+            return hg[i] < hg[j]
+        if hn[i] != hn[j]:
+            return hn[i] < hn[j]
+        return hl[i] < hl[j]
+
+    @njit(cache=True)
+    def _swap(hf, hg, hn, hl, i, j):
+        hf[i], hf[j] = hf[j], hf[i]
+        hg[i], hg[j] = hg[j], hg[i]
+        hn[i], hn[j] = hn[j], hn[i]
+        hl[i], hl[j] = hl[j], hl[i]
+
+    @njit(cache=True)
+    def _push(hf, hg, hn, hl, size, f, g, node, line):
+        hf[size], hg[size], hn[size], hl[size] = f, g, node, line
+        pos = size
+        while pos > 0:
+            parent = (pos - 1) >> 1
+            if not _less(hf, hg, hn, hl, pos, parent):
+                break
+            _swap(hf, hg, hn, hl, pos, parent)
+            pos = parent
+        return size + 1
+
+    @njit(cache=True)
+    def _pop(hf, hg, hn, hl, size):
+        # Le minimum passe en fin de tableau (position size - 1), où l'appelant le lit
+        size -= 1
+        _swap(hf, hg, hn, hl, 0, size)
+        pos = 0
+        while True:
+            child = 2 * pos + 1
+            if child >= size:
+                break
+            if child + 1 < size and _less(hf, hg, hn, hl, child + 1, child):
+                child += 1
+            if not _less(hf, hg, hn, hl, child, pos):
+                break
+            _swap(hf, hg, hn, hl, pos, child)
+            pos = child
+        return size
+
+    @njit(cache=True)
+    def shortest_path_ids(indptr, neighbors, lines, h, start, end, penalty, transfer_line):
+        """
+        A*/Dijkstra sur le graphe CSR. Une arête coûte 1, plus `penalty` quand on change de ligne
+        (hors ligne transfer_line). Retourne (prédécesseurs, coût jusqu'à end, nœuds explorés);
+        le coût vaut inf si end n'est pas atteignable.
+        """
+        n = indptr.shape[0] - 1
+        g_score = np.full(n, np.inf)
+        came_from = np.full(n, -1, dtype=np.int32)
+        closed = np.zeros(n, dtype=np.bool_)
+
+        # Chaque arête est relâchée au plus une fois (depuis un nœud fermé): E + 1 entrées suffisent
+        capacity = neighbors.shape[0] + 1
+        hf = np.empty(capacity)
+        hg = np.empty(capacity)
+        hn = np.empty(capacity, dtype=np.int32)
+        hl = np.empty(capacity, dtype=np.int32)
+
+        g_score[start] = 0.0
+        size = _push(hf, hg, hn, hl, 0, h[start], 0.0, start, -1)
+        nodes_explored = 0
+
+        while size > 0:
+            size = _pop(hf, hg, hn, hl, size)
+            current = hn[size]
+            current_line = hl[size]
+            if closed[current]:
+                continue
+            closed[current] = True
+            nodes_explored += 1
+
+            if current == end:
+                return came_from, g_score[end], nodes_explored
+
+            for k in range(indptr[current], indptr[current + 1]):
+                neighbor = neighbors[k]
+                if closed[neighbor]:
+                    continue
+                neighbor_line = lines[k]
+
+                edge_cost = 1.0
+                if current_line != -1 and neighbor_line != current_line and neighbor_line != transfer_line:
+                    edge_cost += penalty
+
+                tentative_g_score = g_score[current] + edge_cost
+                if tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    size = _push(hf, hg, hn, hl, size, tentative_g_score + h[neighbor],
+                                 tentative_g_score, neighbor, neighbor_line)
+
+        return came_from, np.inf, nodes_explored
+
+    @njit(cache=True)
+    def bucket_shortest_path_ids(indptr, neighbors, lines, start, end, penalty, scale, transfer_line):
+        """
+        Dijkstra à file de seaux (algorithme de Dial). Multipliés par `scale`, les coûts (1 par arête,
+        plus `penalty` par changement de ligne) sont entiers: le seau d'une entrée est sa distance
+        arrondie à l'échelle, et les seaux sont circulaires (le plus grand coût d'arête + 1 suffisent).
+        Dans un seau, la sortie suit l'ordre (distance, station, ligne) de heapq, et les distances
+        restent des sommes de flottants: le résultat est exactement celui de la version à tas.
+        """
+        n = indptr.shape[0] - 1
+        distance = np.full(n, np.inf)
+        came_from = np.full(n, -1, dtype=np.int32)
+        closed = np.zeros(n, dtype=np.bool_)
+
+        n_buckets = int(round((1.0 + penalty) * scale)) + 1
+        heads = np.full(n_buckets, -1, dtype=np.int32)
+        # Chaque arête est relâchée au plus une fois (depuis un nœud fermé): E + 1 entrées suffisent
+        capacity = neighbors.shape[0] + 1
+        entry_dist = np.empty(capacity)
+        entry_node = np.empty(capacity, dtype=np.int32)
+        entry_line = np.empty(capacity, dtype=np.int32)
+        entry_next = np.empty(capacity, dtype=np.int32)
+
+        distance[start] = 0.0
+        entry_dist[0], entry_node[0], entry_line[0], entry_next[0] = 0.0, start, -1, -1
+        heads[0] = 0
+        used = 1
+        pending = 1
+        current_bucket = 0
+        nodes_explored = 0
+
+        while pending > 0:
+            bucket = current_bucket % n_buckets
+            if heads[bucket] == -1:
+                current_bucket += 1
+                continue
+
+            # Plus petite entrée (distance, station, ligne) du seau, détachée de la liste
+            best, best_prev = heads[bucket], -1
+            prev, k = best, entry_next[best]
+            while k != -1:
+                if entry_dist[k] != entry_dist[best]:
+                    smaller = entry_dist[k] < entry_dist[best]
+                elif entry_node[k] != entry_node[best]:
+                    smaller = entry_node[k] < entry_node[best]
+                else:
+                    smaller = entry_line[k] < entry_line[best]
+                if smaller:
+                    best, best_prev = k, prev
+                prev, k = k, entry_next[k]
+            if best_prev == -1:
+                heads[bucket] = entry_next[best]
+            else:
+                entry_next[best_prev] = entry_next[best]
+            pending -= 1
+
+            current = entry_node[best]
+            current_line = entry_line[best]
+            if closed[current]:
+                continue
+            closed[current] = True
+            nodes_explored += 1
+
+            if current == end:
+                return came_from, distance[end], nodes_explored
+
+            for k in range(indptr[current], indptr[current + 1]):
+                neighbor = neighbors[k]
+                if closed[neighbor]:
+                    continue
+                neighbor_line = lines[k]
+
+                edge_cost = 1.0
+                if current_line != -1 and neighbor_line != current_line and neighbor_line != transfer_line:
+                    edge_cost += penalty
+
+                new_distance = entry_dist[best] + edge_cost
+                if new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    came_from[neighbor] = current
+                    target = int(round(new_distance * scale)) % n_buckets
+                    entry_dist[used], entry_node[used], entry_line[used] = new_distance, neighbor, neighbor_line
+                    entry_next[used] = heads[target]
+                    heads[target] = used
+                    used += 1
+                    pending += 1
+
+        return came_from, np.inf, nodes_explored
+else:
+    shortest_path_ids = None
+    bucket_shortest_path_ids = None
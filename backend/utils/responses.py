@@ -0,0 +1,73 @@
+"""
+Réponses HTTP sérialisées avec orjson.
+orjson est bien plus rapide que le module json standard sur les gros GeoJSON
+et gère directement les types numpy renvoyés par pandas.
+"""
+
+import hashlib
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+# MessagePack est optionnel: sans msgspec, on répond toujours en JSON
+try:
+    import msgspec
+    _msgpack_encoder = msgspec.msgpack.Encoder()
+except ImportError:
+    _msgpack_encoder = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+GEOJSON_MEDIA_TYPE = "application/geo+json"
+MSGPACK_AVAILABLE = _msgpack_encoder is not None
+
+
+class ORJSONResponse(Response):
+    """Réponse JSON sérialisée par orjson (classe de réponse par défaut de l'app)"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def dumps(content, default=None) -> bytes:
+    """Sérialise avec les mêmes options que ORJSONResponse (pour les caches de bytes)"""
+    return orjson.dumps(content, default=default, option=ORJSON_OPTIONS)
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Le client demande du MessagePack (en-tête Accept) et msgspec est disponible"""
+    return MSGPACK_AVAILABLE and MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def msgpack_dumps(content) -> bytes:
+    return _msgpack_encoder.encode(content)
+
+
+def make_etag(payload: bytes) -> str:
+    """ETag fort dérivé du contenu (blake2b court, suffisant pour détecter un changement)"""
+    return '"' + hashlib.blake2b(payload, digest_size=8).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Les ETag peuvent arriver en liste, et en version faible (W/) derrière un proxy
+    return any(tag.strip() in (etag, "W/" + etag) for tag in if_none_match.split(","))
+
+
+def cacheable_response(request: Request, payload: bytes, etag: str, max_age: int = 300,
+                       media_type: str = "application/json", vary: str = None) -> Response:
+    """
+    Réponse avec ETag et Cache-Control public.
+    Si le client a déjà cette version (If-None-Match), renvoie un 304 sans corps.
+    """
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if vary:
+        headers["Vary"] = vary
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(payload, media_type=media_type, headers=headers)